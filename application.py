@@ -1,9 +1,12 @@
 import tkinter as tk
 import logging
 import os
+import fcntl
 import threading
 import vlc
 import time
+import struct
+from functools import partial
 from utils.configuration_manager import ConfigurationManager
 from utils.logging_manager import LoggingManager
 from utils.signal_handler import SignalHandler
@@ -12,6 +15,9 @@ from can_system.can_manager import CANManager
 from can_system.command_processor import CommandProcessor
 
 class Application:
+    # Decodes the command, language and video index bytes of a control frame in one call
+    _decode_control_frame = struct.Struct('<BBB').unpack_from
+
     def __init__(self, root):
         self.is_shutting_down = False
         self.lock = threading.Lock()
@@ -23,28 +29,49 @@ class Application:
         self.root.configure(cursor="none")
         self.root.configure(bg='black')
 
-        # Load video base path from config
+        # Load video base path and VLC options from config
         ui_config = self.config_manager.get_config_section("UI")
         self.video_base_path = ui_config["video"]["video_base_path"]
+        vlc_options = ui_config["video"].get("vlc_options", ["--aout=pulse"])
+
+        # Index the available videos once so playback does not stat() the SD card
+        self._video_paths = self._scan_video_paths()
+        self._known_video_paths = frozenset(self._video_paths.values())
+        self._paths_by_lang = self._build_index_path_tables()
 
         # Default language
         self.language = 'hun'  # Default to Hungarian
 
+        # Follow-up videos per language, built once instead of on every video end
+        self._next_video_maps = {}
+        self._rebuild_next_video_map(self.language)
+
         # Create a canvas for video rendering
         self.canvas = tk.Canvas(root, bg='black', highlightthickness=0)
         self.canvas.pack(fill='both', expand=True)
 
-        # VLC media player instance
-        self.instance = vlc.Instance("--aout=pulse")
+        # VLC media player instance; small local-file caching keeps the first frame close to the play request
+        self.instance = vlc.Instance(*vlc_options)
         self.player = self.instance.media_player_new()
 
+        # Playback state mirrored from VLC events so hot paths avoid is_playing() FFI calls
+        self._is_playing = False
+        self._player_stopped = threading.Event()
+        self._end_pipe_r = self._end_pipe_w = None  # Created by _setup_video_end_pipe
+        self._attach_player_state_events()
+        self._configure_player()
+
+        # Media objects are created and parsed once per video and reused on every play
+        self._media_cache = {path: self._new_media(path) for path in self._known_video_paths}
+
         # Initialize CAN components
-        self.can_module = CANModule(self.config_manager.get_config_section("CAN"))
+        can_config = self.config_manager.get_config_section("CAN")
+        self.can_module = CANModule(can_config)
         self.can_manager = CANManager(self.can_module, self.config_manager.get_config_section("CAN_MANAGER"))
         self.command_processor = CommandProcessor(self.root)
 
         # Set fullscreen mode after 100 ms to ensure proper setup
-        self.root.after(100, lambda: self.root.attributes('-fullscreen', True))
+        self.root.after(100, self.root.attributes, '-fullscreen', True)
 
         # Handle key bindings for manual testing
         self.root.bind('<Key>', self.on_key_press)
@@ -54,7 +81,7 @@ class Application:
 
         # Start listening CAN messages
         self.can_manager.start_can_listener(
-            self.config_manager.get_config_section("CAN")["software_filters"], 
+            can_config["software_filters"],
             self._setup_can_message_handlers()
         )
 
@@ -62,6 +89,9 @@ class Application:
 
         # Current video tracker
         self.current_video = None
+
+        # Pipe used to hand VLC end-of-media events over to the Tkinter thread
+        self._setup_video_end_pipe()
         
         # Ensure shutdown on window close
         self.root.protocol("WM_DELETE_WINDOW", self.shutdown_app) 
@@ -71,6 +101,12 @@ class Application:
         logging_manager = LoggingManager(self.config_manager.get_config_section("LOGGING"))
         logging_manager.setup_logging()
         self.logger = logging.getLogger(__name__)
+
+        # Bound log methods for the CAN handlers, saves attribute lookups per frame
+        self._ldebug = self.logger.debug
+        self._linfo = self.logger.info
+        self._lwarn = self.logger.warning
+        self._lerror = self.logger.error
         self.logger.debug("Logging setup complete.")
 
     def _setup_signal_handler(self):
@@ -79,6 +115,30 @@ class Application:
         self.signal_handler.register_signal_handler()
         self.logger.debug("Signal handler setup complete.")
 
+    def _setup_video_end_pipe(self):
+        """Create a pipe that lets the VLC event thread wake the Tkinter event loop."""
+        self._end_pipe_r, self._end_pipe_w = os.pipe()
+
+        # Neither end may block: the writer runs on the libvlc thread, the reader on Tkinter
+        for fd in (self._end_pipe_r, self._end_pipe_w):
+            flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+            fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+
+        self.root.createfilehandler(self._end_pipe_r, tk.READABLE, self._drain_end_events)
+
+    def _close_video_end_pipe(self):
+        """Remove the Tkinter file handler and close both ends of the end-of-media pipe."""
+        if self._end_pipe_r is None:
+            return
+        try:
+            self.root.deletefilehandler(self._end_pipe_r)
+        except tk.TclError:
+            pass  # Tkinter is already gone
+        read_fd, write_fd = self._end_pipe_r, self._end_pipe_w
+        self._end_pipe_r = self._end_pipe_w = None  # Late VLC callbacks see None and skip the write
+        os.close(read_fd)
+        os.close(write_fd)
+
     def on_key_press(self, event):
         key = event.char.lower()
         video_path = self.get_video_path(key)
@@ -87,88 +147,201 @@ class Application:
         elif key == 'q':
             self.quit_app()
 
+    def _scan_video_paths(self):
+        """Scan the video base path once and map (language, video number) to the file path."""
+        video_paths = {}
+        try:
+            for lang in os.listdir(self.video_base_path):
+                lang_dir = os.path.join(self.video_base_path, lang)
+                if not os.path.isdir(lang_dir):
+                    continue
+                for file_name in os.listdir(lang_dir):
+                    if file_name.startswith('video') and file_name.endswith('.mkv'):
+                        video_paths[(lang, file_name[5:-4])] = os.path.join(lang_dir, file_name)
+        except OSError as e:
+            self.logger.error("Failed to scan video directory '%s': %s", self.video_base_path, e)
+        self.logger.debug("Indexed %d videos under '%s'.", len(video_paths), self.video_base_path)
+        return video_paths
+
+    def _build_index_path_tables(self):
+        """Build a tuple per language, indexed by video number, holding the video path or None."""
+        by_index = {}
+        for (lang, number), path in self._video_paths.items():
+            # Only names an index can produce: f"video{index}.mkv", no leading zeros
+            if number.isdigit() and str(int(number)) == number:
+                by_index.setdefault(lang, {})[int(number)] = path
+        return {
+            lang: tuple(paths.get(index) for index in range(max(paths) + 1))
+            for lang, paths in by_index.items()
+        }
+
     def get_video_path(self, key):
         """Get the video path based on the key pressed and current language."""
-        if key.isdigit():
-            return os.path.join(self.video_base_path, self.language, f'video{key}.mkv')
+        if len(key) == 1 and '0' <= key <= '9':
+            return self._get_video_path_by_index(ord(key) - 48)
+        return None
+
+    def _get_video_path_by_index(self, video_index):
+        """Get the video path for a numeric video index in the current language."""
+        paths = self._paths_by_lang.get(self.language)
+        if paths and 0 <= video_index < len(paths):
+            return paths[video_index]
         return None
 
     def play_video(self, video_path):
-        if os.path.exists(video_path):
+        if video_path in self._known_video_paths:
             # Stop any currently playing media
-            if self.player.is_playing():
+            if self._is_playing:
                 self.player.stop()
 
             # Set the current video path
             self.current_video = video_path
 
             # Set the media to the player and play
-            media = self.instance.media_new(video_path)
-            self.player.set_media(media)
-            self.player.audio_output_device_set(None, "hw:CARD=vc4hdmi0,DEV=0")
-
-            # Embed video to the tkinter window
-            self.player.set_xwindow(self.canvas.winfo_id())
-            self.player.video_set_scale(0)
-            self.player.video_set_aspect_ratio("16:9")
-            
+            self.player.set_media(self._get_media(video_path))
             self.player.play()
-            self.player.event_manager().event_attach(vlc.EventType.MediaPlayerEndReached, self.on_video_end)
-
-            self.logger.info(f"Playing video: {video_path}")
+            self._is_playing = True
+
+            self.logger.info("Playing video: %s", video_path)
+
+    def _configure_player(self):
+        """Apply the player settings that persist across media changes."""
+        self.player.audio_output_device_set(None, "hw:CARD=vc4hdmi0,DEV=0")
+
+        # Embed video to the tkinter window
+        self.player.set_xwindow(self.canvas.winfo_id())
+        self.player.video_set_scale(0)
+        self.player.video_set_aspect_ratio("16:9")
+
+    def _attach_player_state_events(self):
+        """Track the VLC playback state from player events."""
+        event_manager = self.player.event_manager()
+        event_manager.event_attach(vlc.EventType.MediaPlayerPlaying, self._on_playing_native)
+        event_manager.event_attach(vlc.EventType.MediaPlayerStopped, self._on_stopped_native)
+        event_manager.event_attach(vlc.EventType.MediaPlayerEncounteredError, self._on_stopped_native)
+        event_manager.event_attach(vlc.EventType.MediaPlayerEndReached, self._on_end_native)
+
+    def _detach_player_state_events(self):
+        """Detach the callbacks registered in _attach_player_state_events."""
+        event_manager = self.player.event_manager()
+        for event_type in (vlc.EventType.MediaPlayerPlaying, vlc.EventType.MediaPlayerStopped,
+                           vlc.EventType.MediaPlayerEncounteredError, vlc.EventType.MediaPlayerEndReached):
+            event_manager.event_detach(event_type)
+
+    def _on_playing_native(self, event):
+        """VLC callback, runs on the libvlc event thread: record that playback started."""
+        self._is_playing = True
+
+    def _on_stopped_native(self, event):
+        """VLC callback, runs on the libvlc event thread: record that playback stopped."""
+        self._is_playing = False
+        self._player_stopped.set()
+
+    def _get_media(self, video_path):
+        """Return the cached VLC media for a video path, creating it on first use."""
+        media = self._media_cache.get(video_path)
+        if media is None:
+            media = self._media_cache[video_path] = self._new_media(video_path)
+        return media
+
+    def _new_media(self, video_path):
+        """Create a VLC media and start parsing its container in the background."""
+        media = self.instance.media_new(video_path)
+        # Asynchronous local parse, so the demuxer metadata is ready before the first play
+        media.parse_with_options(vlc.MediaParseFlag.local, -1)
+        return media
+
+    def _on_end_native(self, event):
+        """VLC callback, runs on the libvlc event thread: only signal the Tkinter thread."""
+        self._is_playing = False
+        write_fd = self._end_pipe_w
+        if write_fd is None:
+            return  # Shutting down, the pipe is closed
+        try:
+            os.write(write_fd, b'\x01')
+        except BlockingIOError:
+            # Pipe is full, the Tkinter thread already has pending wakeups to process
+            pass
+        except OSError:
+            pass  # Closed by shutdown between the check and the write
 
-    def on_video_end(self, event):
-        """Callback when video finishes playing."""
+    def _drain_end_events(self, fd, mask):
+        """Tkinter file handler: consume pending end-of-media signals on the main thread."""
+        try:
+            pending = os.read(fd, 64)
+        except BlockingIOError:
+            return
+        for _ in pending:
+            self.on_video_end()
+
+    def on_video_end(self):
+        """Handle the end of video playback on the Tkinter thread."""
         self.logger.info("Video playback finished.")
 
-        # Logic to play the next video after specific videos end
-        next_video_map = {
-            os.path.join(self.video_base_path, self.language, 'video2.mkv'): os.path.join(self.video_base_path, self.language, 'video3.mkv'),
-            os.path.join(self.video_base_path, self.language, 'video4.mkv'): os.path.join(self.video_base_path, self.language, 'video5.mkv'),
-            os.path.join(self.video_base_path, self.language, 'video6.mkv'): os.path.join(self.video_base_path, self.language, 'video7.mkv'),
-            os.path.join(self.video_base_path, self.language, 'video7.mkv'): os.path.join(self.video_base_path, self.language, 'video8.mkv')
+        # Logic to play the next video after specific videos end; the map for the
+        # current language always exists, see _ensure_next_video_map
+        next_video = self._next_video_maps[self.language].get(self.current_video)
+        if next_video:
+            self.logger.info("Scheduling next video: %s in 3 seconds.", next_video)
+            self.root.after(3000, self.play_video, next_video)
+
+    def _rebuild_next_video_map(self, lang):
+        """Build the map of videos that are automatically followed by another one for a language."""
+        def path(name):
+            return os.path.join(self.video_base_path, lang, name)
+
+        self._next_video_maps[lang] = {
+            path('video2.mkv'): path('video3.mkv'),
+            path('video4.mkv'): path('video5.mkv'),
+            path('video6.mkv'): path('video7.mkv'),
+            path('video7.mkv'): path('video8.mkv')
         }
 
-        if self.current_video in next_video_map:
-            next_video = next_video_map[self.current_video]
-            self.logger.info(f"Scheduling next video: {next_video} in 3 seconds.")
-            self.root.after(3000, lambda: self.play_video(next_video))
+    def _ensure_next_video_map(self):
+        """Build the next video map for the current language if it was not built yet."""
+        if self.language not in self._next_video_maps:
+            self._rebuild_next_video_map(self.language)
 
     def quit_app(self):
         """Quit the application."""
-        if self.player.is_playing():
+        if self._is_playing:
             self.player.stop()
         self.root.destroy()
 
     def can_message_handler(self, arbitration_id, data):
         """Handle incoming CAN messages."""
         try:
+            _, language_code, video_index = self._decode_control_frame(data)
+
             # Set language based on byte 1 of CAN data
-            if data[1] == 0x01:
+            if language_code == 0x01:
                 self.language = 'hun'
-                self.logger.info("Language set to Hungarian.")
-            elif data[1] == 0x02:
+                self._ensure_next_video_map()
+                self._linfo("Language set to Hungarian.")
+            elif language_code == 0x02:
                 self.language = 'eng'
-                self.logger.info("Language set to English.")
+                self._ensure_next_video_map()
+                self._linfo("Language set to English.")
             else:
-                self.logger.warning(f"Unknown language code received: {data[1]}")
+                self._lwarn("Unknown language code received: %s", language_code)
 
             # Play video based on byte 2 (assuming byte 2 is the video index)
-            video_index = data[2]
-            video_path = self.get_video_path(str(video_index))
+            video_path = self._get_video_path_by_index(video_index)
             if video_path:
-                self.logger.info(f"CAN message received to play video {video_index}.")
-                self.logger.debug(f"Scheduling play_video() from thread: {threading.current_thread().name}")
+                self._linfo("CAN message received to play video %s.", video_index)
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self._ldebug("Scheduling play_video() from thread: %s", threading.current_thread().name)
                 self.command_processor.enqueue_command(self.play_video, video_path)
             else:
-                self.logger.warning(f"Invalid video index received: {video_index}")
+                self._lwarn("Invalid video index received: %s", video_index)
         except Exception as e:
-            self.logger.error(f"Error processing CAN message: {e}")
+            self._lerror("Error processing CAN message: %s", e)
 
     def _setup_can_message_handlers(self):
         """Define CAN message handlers."""
+        # Partials bind the enqueue target once, avoiding an extra lambda frame per CAN message
         return {
-            "control": lambda id, data: self.command_processor.enqueue_command(self.can_message_handler, id, data)
+            "control": partial(self.command_processor.enqueue_command, self.can_message_handler)
         }
 
     def shutdown_app(self):
@@ -180,8 +353,7 @@ class Application:
 
                 # Stop CAN listener and responder
                 self.logger.info("Stopping CAN listener and responder.")
-                self.can_manager.stop_can_listener()
-                self.can_manager.stop_can_responder()
+                self.can_manager.close()
 
                 # Wait for a short time to allow any remaining CAN messages to be processed
                 time.sleep(1)
@@ -194,10 +366,11 @@ class Application:
                 self.can_module.shutdown()
 
                 # Stop VLC player
-                if self.player.is_playing():
+                if self._is_playing:
                     self.logger.info("Stopping VLC player.")
-                    self.player.stop()
-                    time.sleep(0.1)  # Ensure resources are released
+                    self._stop_player_and_wait()
+                self._detach_player_state_events()
+                self._close_video_end_pipe()
                 self._process_ui_updates()
 
                 # Close the Tkinter window
@@ -207,6 +380,13 @@ class Application:
                 except tk.TclError:
                     self.logger.warning("Tkinter window already destroyed.")
 
+    def _stop_player_and_wait(self, timeout=0.1):
+        """Stop the VLC player and wait until it reports the stop, bounded by a timeout."""
+        self._player_stopped.clear()
+        self.player.stop()
+        if not self._player_stopped.wait(timeout):
+            self.logger.warning("VLC player did not report stop within %.2f seconds.", timeout)
+
     def _process_ui_updates(self):
         """Periodically update the UI to process events."""
         try:
@@ -3,6 +3,9 @@ import logging
 import threading
 import os
 import sys
+import queue
+import struct
+from functools import partial
 from typing import Callable
 from utils.configuration_manager import ConfigurationManager
 from utils.signal_handler import SignalHandler
@@ -16,31 +19,71 @@ from ui.video_player import VideoPlayer
 from ui.countdown_timer import CountdownTimer
 from ui.hint_display import HintDisplay
 
+# Folder selection byte of a control frame mapped to the asset folder name
+_FOLDER_NAMES = {0x01: "hun", 0x02: "eng"}
+
 class Application:
+    TIMER_COALESCE_MS = 100  # CAN-driven countdown updates are applied at most this often
+
+    # Decodes the command byte plus the three parameter bytes of a control frame in one call
+    _decode_control_frame = struct.Struct('<BBBB').unpack_from
+
     def __init__(self) -> None:
         """Initialize the Application class, including thread locks for handling restart and shutdown."""
         self.restart_in_progress = False
         self.shutdown_in_progress = False
         self.correctness = 0b000
+        self._timer_frame = None  # Latest timer control frame not yet applied, written by the CAN thread
+        self._timer_window_open = False
+        self._timer_after_id = None  # Pending _close_timer_window callback
         self.lock = threading.Lock()  # Protects shutdown and restart states
-        self.init_application()
+
+        # Long-lived worker that runs restart/shutdown cleanups off the Tkinter thread
+        self._cleanup_queue: queue.Queue[Callable[[], None]] = queue.Queue()
+        self._cleanup_worker = threading.Thread(target=self._cleanup_loop, daemon=True, name="CleanupWorker")
+        self._cleanup_worker.start()
+        self._init_once()
+        self._init_ui()
 
     def init_application(self) -> None:
         """Initialize core application components including logging, UI, CAN, and signal handling."""
+        self._init_once()
+        self._init_ui()
+
+    def _init_once(self) -> None:
+        """Initialize the long-lived subsystems: configuration, logging, signal handling and CAN."""
         self.config_manager = ConfigurationManager('config.json')
         self._setup_logging()
         self._setup_signal_handler()
 
+        config_manager = self.config_manager
+        self.ui_config = config_manager.get_config_section("UI")
+        can_config = config_manager.get_config_section("CAN")
+        can_manager_config = config_manager.get_config_section("CAN_MANAGER")
+        self.can_filters = can_config["software_filters"]
+
+        self.can_module = CANModule(self.logger, can_config)
+        self.can_manager = CANManager(self.can_module, self.logger, can_manager_config)
+
+    def _init_ui(self) -> None:
+        """Initialize the Tkinter root, displays and command processing; repeated on every restart."""
+        # A coalescing window left open by the previous root would never close, reset it with the UI
+        if self._timer_after_id is not None:
+            try:
+                self.root.after_cancel(self._timer_after_id)
+            except tk.TclError:
+                pass  # The previous root is already destroyed, and its callbacks with it
+            self._timer_after_id = None
+        self._timer_window_open = False
+        self._timer_frame = None
         self.root = tk.Tk()
-        self._setup_ui()
+        self._setup_ui(self.ui_config)
 
         self.ui_manager = UIManager(self.root, self.logger)
         self.command_processor = CommandProcessor(self.root, self.logger)
+        self.can_filter_to_handler = self._setup_can_message_handlers()
 
-        self.can_module = CANModule(self.logger, self.config_manager.get_config_section("CAN"))
-        self.can_manager = CANManager(self.can_module, self.logger, self.config_manager.get_config_section("CAN_MANAGER"))
-
-        self._setup_displays()
+        self._setup_displays(self.ui_config)
         self.video_player.set_on_video_end_callback(self.display_correctness_image)
 
     def _setup_logging(self) -> None:
@@ -48,6 +91,12 @@ class Application:
         logging_manager = LoggingManager(self.config_manager.get_config_section("LOGGING"))
         logging_manager.setup_logging()
         self.logger = logging.getLogger(__name__)
+
+        # Bound log methods for the CAN handlers, saves attribute lookups per frame
+        self._ldebug = self.logger.debug
+        self._linfo = self.logger.info
+        self._lwarn = self.logger.warning
+        self._lerror = self.logger.error
         self.logger.debug("Logging setup complete.")
 
     def _setup_signal_handler(self) -> None:
@@ -56,9 +105,8 @@ class Application:
         self.signal_handler.register_signal_handler()
         self.logger.debug("Signal handler setup complete.")
 
-    def _setup_ui(self) -> None:
+    def _setup_ui(self, ui_config: dict) -> None:
         """Setup UI components such as root window and canvas."""
-        ui_config = self.config_manager.get_config_section("UI")
         self.root.title(ui_config.get("title", "Delayed Full Screen Canvas"))
         self.root.config(cursor="none")
         self.canvas = tk.Canvas(self.root, bg=ui_config.get("bg_color"), highlightthickness=0)
@@ -70,9 +118,8 @@ class Application:
         self.root.bind("<space>", lambda event: self.video_player.play_video("hun", 1))  # SPACE to start video
         self.root.bind("<Escape>", lambda event: self.video_player.stop_video())  # ESC to stop video
 
-    def _setup_displays(self) -> None:
+    def _setup_displays(self, ui_config: dict) -> None:
         """Setup display components for standby, video, timer, and hints."""
-        ui_config = self.config_manager.get_config_section("UI")
         self.standby_display = StandbyDisplay(self.canvas, ui_config.get("standby", {}))
         self.video_player = VideoPlayer(self.root, self.canvas, ui_config.get("video", {}))
         self.countdown_timer = CountdownTimer(self.canvas, ui_config.get("timer", {}))
@@ -88,13 +135,9 @@ class Application:
         self.root.after(100, self.ui_manager.set_fullscreen)
         self.root.after(500, self.standby_display.display_background)
 
-        # Define CAN message filters and handlers
-        can_filter_to_handler = self._setup_can_message_handlers()
-        
-        # Start CANListener and CANResponder threads
-        can_filters = self.config_manager.get_config_section("CAN")["software_filters"]
-        self.can_manager.start_can_listener(can_filters, can_filter_to_handler)
-        self.can_manager.start_can_responder(self.video_player.get_video_status, lambda: self.correctness)
+        # Start the CAN reactor thread serving both the listener and the responder
+        self.can_manager.start_can_io(self.can_filters, self.can_filter_to_handler,
+                                      self.video_player.get_video_status, lambda: self.correctness)
 
         self.command_processor.process_queue()
 
@@ -123,15 +166,15 @@ class Application:
                 self.standby_display.display_image(f"assets/images/{folder_name}/image0.png")
                 self.logger.debug("No correctness bits set. Displaying default image0.")
         except Exception as e:
-            self.logger.error(f"Error in display_correctness_image: {e}")
+            self.logger.error("Error in display_correctness_image: %s", e)
 
     def handle_video_control(self, arbitration_id, data):
-        folder_selection = data[1]  # Folder selection
-        play_video_flag = data[2]   # 0 for image display, non-zero for video play
-        correctness_bits = data[3]   # Last three bits represent correctness for games
+        # Byte 1: folder selection, byte 2: 0 for image display, non-zero for video play,
+        # byte 3: last three bits represent correctness for games
+        _, folder_selection, play_video_flag, correctness_bits = self._decode_control_frame(data)
 
         # Map folder selection to folder names
-        folder_name = "hun" if folder_selection == 0x01 else "eng" if folder_selection == 0x02 else "Unknown"
+        folder_name = _FOLDER_NAMES.get(folder_selection, "Unknown")
 
         if play_video_flag == 0:
             # Display images based on correctness of games
@@ -142,36 +185,56 @@ class Application:
             if game1_correct:
                 self.standby_display.display_image(f"assets/images/{folder_name}/image1.png")
                 self.correctness |= 0b100
-                self.logger.debug("Game 1 is correct. Displaying image1.")
+                self._ldebug("Game 1 is correct. Displaying image1.")
             if game2_correct:
                 self.standby_display.display_image(f"assets/images/{folder_name}/image2.png")
                 self.correctness |= 0b010
-                self.logger.debug("Game 2 is correct. Displaying image2.")
+                self._ldebug("Game 2 is correct. Displaying image2.")
             if game3_correct:
                 self.standby_display.display_image(f"assets/images/{folder_name}/image3.png")
                 self.correctness |= 0b001
-                self.logger.debug("Game 3 is correct. Displaying image3.")
+                self._ldebug("Game 3 is correct. Displaying image3.")
 
             if not (game1_correct or game2_correct or game3_correct):
                 # No games are marked correct
                 self.standby_display.display_image(f"assets/images/{folder_name}/image0.png")
                 self.correctness = 0b000  # Reset correctness bits
-                self.logger.debug("No games are marked correct. Displaying image0.")
+                self._ldebug("No games are marked correct. Displaying image0.")
         else:
             # Play video from selected folder
             if folder_name != "Unknown":
-                self.logger.debug(f"Received CAN message to play video from folder '{folder_name}', video number '{play_video_flag}'.")
+                self._ldebug("Received CAN message to play video from folder '%s', video number '%s'.", folder_name, play_video_flag)
                 self.video_player.play_video(folder_name, play_video_flag)
             else:
-                self.logger.error("Invalid folder selection received for video playback.")
+                self._lerror("Invalid folder selection received for video playback.")
 
-        # Trigger a CAN response as needed
+        # Trigger a CAN response as needed; CANManager debounces back-to-back triggers
         self.can_manager.trigger_immediate_response()
 
+    def _on_timer_frame(self, arbitration_id, data) -> None:
+        """CAN thread: keep only the latest timer frame, enqueueing a flush when no coalescing window is open."""
+        self._timer_frame = (arbitration_id, data)
+        if not self._timer_window_open:
+            self._timer_window_open = True
+            self.command_processor.enqueue_command(self._flush_timer_frame)
+
+    def _flush_timer_frame(self) -> None:
+        """Apply the latest timer frame and hold further updates back for TIMER_COALESCE_MS."""
+        frame, self._timer_frame = self._timer_frame, None
+        if frame is not None:
+            self.handle_timer_control(*frame)
+        self._timer_after_id = self.root.after(self.TIMER_COALESCE_MS, self._close_timer_window)
+
+    def _close_timer_window(self) -> None:
+        """End the coalescing window, applying a frame that arrived during it."""
+        self._timer_after_id = None
+        self._timer_window_open = False
+        if self._timer_frame is not None:
+            self._timer_window_open = True
+            self._flush_timer_frame()
+
     def handle_timer_control(self, arbitration_id, data):
-        display_control = data[1]
-        time_hi = data[2]
-        time_lo = data[3]
+        _, display_control, time_hi, time_lo = self._decode_control_frame(data)
         total_seconds = (time_hi << 8) | time_lo
 
         if display_control == 0x01:
@@ -183,11 +246,12 @@ class Application:
     def _setup_can_message_handlers(self) -> dict:
         """Define CAN message filters and handlers."""
         self.logger.debug("Setting up CAN message handlers.")
+        enqueue_command = self.command_processor.enqueue_command
         return {
-            "video_control": lambda id, data: self.command_processor.enqueue_command(self.handle_video_control, id, data),
-            "timer_control": lambda id, data: self.command_processor.enqueue_command(self.handle_timer_control, id, data),
-            "restart": lambda id, data: self.command_processor.enqueue_command(self.restart_app),
-            "shutdown": lambda id, data: self.command_processor.enqueue_command(self.shutdown_system)
+            "video_control": partial(enqueue_command, self.handle_video_control),
+            "timer_control": self._on_timer_frame,  # Coalesced, the countdown redraws at most every TIMER_COALESCE_MS
+            "restart": lambda id, data: enqueue_command(self.restart_app),
+            "shutdown": lambda id, data: enqueue_command(self.shutdown_system)
         }
 
     def restart_app(self) -> None:
@@ -215,21 +279,32 @@ class Application:
             self.restart_in_progress = cleanup_action == self._restart_ui_cleanup
             self.shutdown_in_progress = cleanup_action in (self._shutdown_ui_cleanup, self._system_shutdown_cleanup)
 
-        threading.Thread(target=self._cleanup_and_execute_action, args=(cleanup_action,)).start()
+        # Called on the Tkinter thread: stop the Tk-side components here, the worker only does the blocking teardown
+        self.logger.debug("Stopping application components.")
+        self.command_processor.stop_processing()
+        self.countdown_timer.stop()
+        self._cleanup_queue.put(cleanup_action)
+
+    def _cleanup_loop(self) -> None:
+        """Run queued cleanup actions one at a time in the CleanupWorker thread."""
+        while True:
+            cleanup_action = self._cleanup_queue.get()
+            self._cleanup_and_execute_action(cleanup_action)
 
     def _cleanup_and_execute_action(self, cleanup_action: Callable[[], None]) -> None:
-        """Stop processes and perform cleanup actions."""
+        """CleanupWorker: stop the CAN I/O, then hand the cleanup action back to the Tkinter thread."""
         try:
-            self.logger.debug("Stopping application components.")
-            self.command_processor.stop_processing()
-            self.can_manager.stop_can_listener()
-            self.can_manager.stop_can_responder()
-            self.can_module.shutdown()
-            self.countdown_timer.stop()
+            self.can_manager.stop_can_io()
+            # The CAN handlers were the last enqueuers; stop_processing already ran on the Tkinter thread
+            self.command_processor.close()
+            if cleanup_action != self._restart_ui_cleanup:
+                # The CAN bus and the manager outlive restarts, only release them when shutting down
+                self.can_manager.close()
+                self.can_module.shutdown()
 
             self.root.after(100, cleanup_action)
         except Exception as e:
-            self.logger.error(f"Cleanup operation failed: {e}")
+            self.logger.error("Cleanup operation failed: %s", e)
         finally:
             with self.lock:
                 if cleanup_action in (self._shutdown_ui_cleanup, self._system_shutdown_cleanup):
@@ -243,7 +318,7 @@ class Application:
         """Restart the application UI."""
         self.logger.debug("Restarting UI.")
         self._cleanup_ui()
-        self.init_application()
+        self._init_ui()
         self.start()
 
     def _shutdown_ui_cleanup(self) -> None:
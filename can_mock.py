@@ -1,12 +1,38 @@
 import can
 import threading
 import time
-import os
+import atexit
+import subprocess
+import struct
 
 CAN_DEVICE_ID = 0x0DA
 CAN_CHANNEL = 'can0'
 BITRATE = 100000
 
+# Play video N from the Hungarian folder, keyed by the interactive mode input
+VIDEO_PAYLOADS = {str(i): bytes([0x04, 0x01, i, 0x00, 0x00, 0x00, 0x00, 0x00]) for i in range(1, 9)}
+
+_BUS = None
+_BUS_LOCK = threading.Lock()
+
+def _get_bus():
+    """Return the shared CAN bus, opening it on first use."""
+    global _BUS
+    if _BUS is None:
+        with _BUS_LOCK:
+            if _BUS is None:
+                _BUS = can.interface.Bus(channel=CAN_CHANNEL, interface='socketcan', bitrate=BITRATE)
+                atexit.register(_shutdown_bus)
+    return _BUS
+
+def _shutdown_bus():
+    """Close the shared CAN bus if it was opened."""
+    global _BUS
+    with _BUS_LOCK:
+        if _BUS is not None:
+            _BUS.shutdown()
+            _BUS = None
+
 def setup_virtual_can():
     """
     Sets up a virtual CAN interface (can0).
@@ -16,14 +42,20 @@ def setup_virtual_can():
     sudo ip link add dev can0 type vcan
     sudo ip link set up can0
     """
-    os.system("sudo modprobe vcan")
-    os.system("sudo ip link add dev can0 type vcan")
-    os.system("sudo ip link set up can0")
+    # Skip the setup entirely if the interface already exists
+    if subprocess.run(["ip", "link", "show", CAN_CHANNEL], capture_output=True).returncode == 0:
+        return
+
+    # One sudo invocation for all three steps instead of a shell per command
+    setup_script = f"modprobe vcan && ip link add dev {CAN_CHANNEL} type vcan && ip link set up {CAN_CHANNEL}"
+    result = subprocess.run(["sudo", "sh", "-c", setup_script], check=False, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"Failed to set up virtual CAN interface: {result.stderr.strip()}")
 
 def send_specific_can_message(message_id, data):
     """Send a specific CAN message based on user input."""
     try:
-        bus = can.interface.Bus(channel=CAN_CHANNEL, bustype='socketcan', bitrate=BITRATE)
+        bus = _get_bus()
         message = can.Message(arbitration_id=message_id, data=data, is_extended_id=False)
 
         bus.send(message)
@@ -38,22 +70,24 @@ def countdown_sender():
     total_seconds = 3600
 
     try:
-        bus = can.interface.Bus(channel=CAN_CHANNEL, bustype='socketcan', bitrate=BITRATE)
+        bus = _get_bus()
+
+        # Build the frame once; only the big-endian seconds in bytes 2-3 change per tick
+        message = can.Message(arbitration_id=CAN_DEVICE_ID, data=bytearray(b"\x0C\x01\x00\x00\x00\x00\x00\x00"), is_extended_id=False)
+        next_tick = time.monotonic()
 
         while total_seconds >= 0:
-            time_hi = (total_seconds >> 8) & 0xFF
-            time_lo = total_seconds & 0xFF
-            data = [0x0C, 0x01, time_hi, time_lo, 0x00, 0x00, 0x00, 0x00]
+            struct.pack_into(">H", message.data, 2, total_seconds)
 
-            message = can.Message(arbitration_id=CAN_DEVICE_ID, data=data, is_extended_id=False)
-            
             try:
                 bus.send(message)
                 print(f"Sent CAN countdown message: ID={hex(message.arbitration_id)}, Data={message.data}")
             except can.CanError as e:
                 print(f"Failed to send CAN message: {e}")
 
-            time.sleep(1)
+            # Sleep until the next absolute tick so send time does not accumulate as drift
+            next_tick += 1
+            time.sleep(max(0.0, next_tick - time.monotonic()))
             total_seconds -= 1
 
         print("Countdown completed.")
@@ -63,58 +97,23 @@ def countdown_sender():
 def interactive_mode():
     """Function to handle user input and send messages accordingly."""
     while True:
-        user_input = input("Press 1-4 to send Messages or 'q' to quit: ").strip()
-        
-        if user_input == '1':
-            message_id = 0x0DA
-            data = [0x04, 0x01, 0x01, 0x00, 0x00, 0x00, 0x00, 0x00]
-            send_specific_can_message(message_id, data)
-        
-        elif user_input == '2':
-            message_id = 0x0DA
-            data = [0x04, 0x01, 0x02, 0x00, 0x00, 0x00, 0x00, 0x00]
-            send_specific_can_message(message_id, data)
-     
-        elif user_input == '3':
-            message_id = 0x0DA
-            data = [0x04, 0x01, 0x03, 0x00, 0x00, 0x00, 0x00, 0x00]
-            send_specific_can_message(message_id, data)
-
-        elif user_input == '4':
-            message_id = 0x0DA
-            data = [0x04, 0x01, 0x04, 0x00, 0x00, 0x00, 0x00, 0x00]
-            send_specific_can_message(message_id, data)    
-        
-        if user_input == '5':
-            message_id = 0x0DA
-            data = [0x04, 0x01, 0x05, 0x00, 0x00, 0x00, 0x00, 0x00]
-            send_specific_can_message(message_id, data)
-        
-        elif user_input == '6':
-            message_id = 0x0DA
-            data = [0x04, 0x01, 0x06, 0x00, 0x00, 0x00, 0x00, 0x00]
-            send_specific_can_message(message_id, data)
-     
-        elif user_input == '7':
-            message_id = 0x0DA
-            data = [0x04, 0x01, 0x07, 0x00, 0x00, 0x00, 0x00, 0x00]
-            send_specific_can_message(message_id, data)
-
-        elif user_input == '8':
-            message_id = 0x0DA
-            data = [0x04, 0x01, 0x08, 0x00, 0x00, 0x00, 0x00, 0x00]
-            send_specific_can_message(message_id, data)    
+        user_input = input("Press 1-8 to send Messages or 'q' to quit: ").strip()
+
+        payload = VIDEO_PAYLOADS.get(user_input)
+        if payload:
+            send_specific_can_message(CAN_DEVICE_ID, payload)
 
         elif user_input.lower() == 'q':
             print("Exiting interactive mode.")
             break
-        
+
         else:
-            print("Invalid input. Please press '1-9' or 'q'.")
+            print("Invalid input. Please press '1-8' or 'q'.")
 
 def receive_can_messages():
     """Function to receive CAN messages and print them."""
     try:
+        # Own socket: a socketcan bus does not receive the frames it sent itself, so sharing the senders' bus would hide them
         bus = can.interface.Bus(channel=CAN_CHANNEL, interface='socketcan', bitrate=BITRATE)
 
         while True:
@@ -1,11 +1,20 @@
+import os
+import errno
+import select
+import socket
 import threading
 import time
 import logging
-from .can_module import CANModule
-from typing import Callable, Dict, List
+from .can_module import CANModule, DispatchTable
+from typing import Callable, Dict, List, Optional, Tuple, Union
 from can import CanError
 
+# Callbacks used by the responder: (get_video_status, get_correctness)
+ResponderCallbacks = Tuple[Callable[[], tuple], Callable[[], int]]
+
 class CANManager:
+    MAX_RETRIES = 5
+
     def __init__(self, can_module: CANModule, config: dict) -> None:
         """Initialize CANManager with a CAN module and configuration."""
         self.can_module = can_module
@@ -15,159 +24,352 @@ class CANManager:
         self.responder_poll_interval = config.get("responder_thread_poll_interval", 0.1)
         self.responder_initial_delay = config.get("responder_initial_delay", 2)
         self.responder_periodic_interval = config.get("responder_periodic_interval", 2)
+        # Longest gap between periodic frames whose content did not change. Unchanged frames are skipped
+        # until it elapses; the default equals the periodic interval, so every periodic frame goes out.
+        self.responder_watchdog_interval = config.get("responder_watchdog_interval", self.responder_periodic_interval)
+        self.responder_debounce_interval = config.get("responder_debounce_interval", 0.01)
+        self.busy_poll_us = config.get("busy_poll_us", 50)
+        self.listener_rt_priority = config.get("listener_rt_priority", 20)
+        self.listener_cpu = config.get("listener_cpu", None)
+        self.listener_max_batch = config.get("listener_max_batch", 32)
+
+        # A single reactor thread serves both the listener and the responder
+        self.can_io_thread: threading.Thread = None
+        self.can_io_stop_event = threading.Event()
+        self._dispatch: Optional[DispatchTable] = None
+        self._responder: Optional[ResponderCallbacks] = None
 
-        self.can_listener_thread: threading.Thread = None
-        self.can_responder_thread: threading.Thread = None
-        
         self.immediate_response_event = threading.Event()
-        self.can_listener_stop_event = threading.Event()
-        self.can_responder_stop_event = threading.Event()
 
         self.lock = threading.Lock()
 
+        # Responder state, kept across reactor restarts so toggling the listener does not reset timing
+        self._response_buffer = bytearray(b"\x03\x00\x00\x00\x00\x00\x00\x00")  # Only bytes 1-3 change
+        self._next_send_time = 0.0
+        self._last_sent_time = float("-inf")
+        self._last_response: Optional[bytes] = None
+        self._force_send = False
+        self._responder_retry_count = 0
+
+        # Pipe used to wake the reactor out of epoll for stops and immediate responses
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        os.set_blocking(self._wakeup_r, False)
+        os.set_blocking(self._wakeup_w, False)
+
+        self._enable_busy_poll()
+
         self.logger.debug("CANManager initialized.")
 
-    def start_can_listener(self, filters: List[dict], can_filter_to_handler: Dict[str, Callable]) -> None:
-        """Start the CANListener thread to handle incoming CAN messages."""
+    def _enable_busy_poll(self) -> None:
+        """Set SO_BUSY_POLL on the CAN socket so receives busy-poll the driver before sleeping."""
+        if not self.busy_poll_us:
+            return
+        try:
+            # Operate on a duplicate of the descriptor; socket options are shared with the original
+            sock = socket.fromfd(self.can_module.fileno(), socket.AF_CAN, socket.SOCK_RAW, socket.CAN_RAW)
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, getattr(socket, "SO_BUSY_POLL", 46), self.busy_poll_us)
+            finally:
+                sock.close()
+            self.logger.debug("SO_BUSY_POLL set to %s us on the CAN socket.", self.busy_poll_us)
+        except PermissionError:
+            self.logger.warning("Insufficient permissions to enable SO_BUSY_POLL (requires CAP_NET_ADMIN).")
+        except (AttributeError, NotImplementedError, OSError) as e:
+            self.logger.warning("Unable to enable SO_BUSY_POLL on the CAN socket: %s", e)
+
+    def start_can_io(self, filters: List[dict], can_filter_to_handler: Dict[str, Callable],
+                     get_video_status: Callable[[], tuple], get_correctness: Callable[[], int]) -> None:
+        """Start listening and responding on the CAN bus with a single reactor thread."""
+        self._configure_listener(filters, can_filter_to_handler)
+        self._configure_responder(get_video_status, get_correctness)
+        self._restart_can_io()
+
+    def stop_can_io(self) -> None:
+        """Stop both the listener and the responder."""
+        self._dispatch = None
+        self._responder = None
+        self._stop_can_io_thread()
+
+    def close(self) -> None:
+        """Stop the CAN I/O for good and close the reactor's wakeup pipe."""
+        self.stop_can_io()
         with self.lock:
-            # Ensure the old listener thread is stopped if running
-            if self.can_listener_thread and self.can_listener_thread.is_alive():
-                self.logger.debug("Stopping old CANListener thread before starting a new one.")
-                self.stop_can_listener()
-
-            # Start a new listener thread
-            self.logger.info("Starting CANListener thread.")
-            self.can_listener_stop_event.clear()
-            self.can_listener_thread = threading.Thread(
-                target=self._can_message_handler,
-                args=(filters, can_filter_to_handler),
-                daemon=True,
-                name="CANListener"
-            )
-            self.can_listener_thread.start()
+            if self._wakeup_r is None:
+                return
+            wakeup_r, wakeup_w = self._wakeup_r, self._wakeup_w
+            self._wakeup_r = self._wakeup_w = None
+        os.close(wakeup_r)
+        os.close(wakeup_w)
+        self.logger.debug("CANManager closed.")
+
+    def start_can_listener(self, filters: List[dict], can_filter_to_handler: Dict[str, Callable]) -> None:
+        """Start handling incoming CAN messages in the reactor thread."""
+        self._configure_listener(filters, can_filter_to_handler)
+        self._restart_can_io()
 
     def stop_can_listener(self) -> None:
-        with self.lock:
-            if self.can_listener_thread and self.can_listener_thread.is_alive():
-                self.can_listener_stop_event.set()
-                self.can_listener_thread.join()  # Wait for the thread to exit
-                self.logger.info("CANListener thread stopped.")
-                self.can_listener_thread = None  # Reset the thread reference
+        """Stop handling incoming CAN messages, keeping the responder running if it is started."""
+        if self._dispatch is not None:
+            self._dispatch = None
+            self._restart_can_io()
+            self.logger.info("CAN listener stopped.")
 
     def start_can_responder(self, get_video_status: Callable[[], tuple], get_correctness: Callable[[], int]) -> None:
-        """Start the CANResponder thread to send periodic and immediate response messages."""
-        with self.lock:
-            # Ensure the old responder thread is stopped if running
-            if self.can_responder_thread and self.can_responder_thread.is_alive():
-                self.logger.debug("Stopping old CANResponder thread before starting a new one.")
-                self.stop_can_responder()
-
-            # Start a new responder thread
-            self.logger.info("Starting CANResponder thread.")
-            self.can_responder_stop_event.clear()
-            self.can_responder_thread = threading.Thread(
-                target=self._send_periodic_responses,
-                args=(get_video_status, get_correctness),
-                daemon=True,
-                name="CANResponder"
-            )
-            self.can_responder_thread.start()
+        """Start sending periodic and immediate response messages from the reactor thread."""
+        self._configure_responder(get_video_status, get_correctness)
+        self._restart_can_io()
 
     def stop_can_responder(self) -> None:
-        with self.lock:
-            if self.can_responder_thread and self.can_responder_thread.is_alive():
-                self.can_responder_stop_event.set()
-                self.can_responder_thread.join()  # Wait for the thread to exit
-                self.logger.info("CANResponder thread stopped.")
-                self.can_responder_thread = None  # Reset the thread reference
+        """Stop sending response messages, keeping the listener running if it is started."""
+        if self._responder is not None:
+            self._responder = None
+            self._restart_can_io()
+            self.logger.info("CAN responder stopped.")
 
     def trigger_immediate_response(self) -> None:
         """Trigger an immediate response."""
         self.immediate_response_event.set()
+        self._wake_can_io()
         self.logger.debug("Immediate response triggered.")
 
-    def _can_message_handler(self, filters: List[dict], can_filter_to_handler: Dict[str, Callable]) -> None:
-        """Continuously handle incoming CAN messages in the CANListener thread with error handling and retries."""
-        retry_count = 0
-        max_retries = 5
+    def _configure_listener(self, filters: List[dict], can_filter_to_handler: Dict[str, Callable]) -> None:
+        """Prepare kernel filters and the dispatch table for the listener."""
+        # Let the kernel drop frames outside the filters' ID ranges before they reach Python
+        self.can_module.apply_kernel_filters(filters)
+
+        # Resolve filters to handlers once instead of scanning the filter list by name per frame
+        self._dispatch = self.can_module.build_dispatch_table(filters, can_filter_to_handler)
+        self.logger.info("CAN listener configured.")
+
+    def _configure_responder(self, get_video_status: Callable[[], tuple], get_correctness: Callable[[], int]) -> None:
+        """Reset the responder state and schedule its first send after the initial delay."""
+        self._responder = (get_video_status, get_correctness)
+        self._next_send_time = time.monotonic() + self.responder_initial_delay
+        self._last_sent_time = float("-inf")
+        self._last_response = None
+        self._force_send = False
+        self._responder_retry_count = 0
+        self.immediate_response_event.clear()
+        self.logger.info("CAN responder configured.")
+
+    def _restart_can_io(self) -> None:
+        """Restart the reactor thread so it picks up the current listener/responder configuration."""
+        self._stop_can_io_thread()
+        dispatch, responder = self._dispatch, self._responder
+        if dispatch is None and responder is None:
+            return
+
+        # Each thread gets its own stop event so a late stop can never be cleared by a new start
+        stop_event = threading.Event()
+        thread = threading.Thread(
+            target=self._can_io_loop,
+            args=(dispatch, responder, stop_event),
+            daemon=True,
+            name="CANReactor"
+        )
+        with self.lock:  # Only guards the reference swap, never held across start/join
+            if self.can_io_thread is not None:
+                self.logger.debug("CANReactor thread was started concurrently, not starting another one.")
+                return
+            self.can_io_thread = thread
+            self.can_io_stop_event = stop_event
+
+        self.logger.info("Starting CANReactor thread.")
+        thread.start()
+
+    def _stop_can_io_thread(self) -> None:
+        """Stop the reactor thread and wait for it to exit."""
+        with self.lock:
+            thread, self.can_io_thread = self.can_io_thread, None
+            stop_event = self.can_io_stop_event
+        if thread and thread.is_alive():
+            stop_event.set()
+            self._wake_can_io()
+            if thread is threading.current_thread():
+                # Called from the reactor itself (e.g. from a handler): it exits once it returns to its loop
+                self.logger.debug("CANReactor thread asked to stop itself.")
+                return
+            thread.join()  # Wait for the thread to exit
+            self.logger.info("CANReactor thread stopped.")
+
+    def _wake_can_io(self) -> None:
+        """Interrupt the reactor's epoll wait."""
+        wakeup_w = self._wakeup_w
+        if wakeup_w is None:
+            return  # Closed, no reactor to wake
         try:
-            while not self.can_listener_stop_event.is_set():
-                try:
-                    self.can_module.handle_can_message(filters, can_filter_to_handler)
-                    retry_count = 0  # Reset retry count on success
-                except Exception as e:
-                    retry_count += 1
-                    self.logger.error(f"CANListener encountered an error: {e} (retry {retry_count}/{max_retries})")
-                    if retry_count >= max_retries:
-                        self.logger.critical("CANListener thread stopping due to repeated errors.")
-                        break  # Exit loop if too many consecutive errors
-                time.sleep(self.listener_poll_interval)
+            os.write(wakeup_w, b'\x00')
+        except BlockingIOError:
+            pass  # A wakeup is already pending
+        except OSError:
+            pass  # Closed by close() between the check and the write
+
+    def _drain_wakeups(self) -> None:
+        """Consume pending bytes from the wakeup pipe."""
+        try:
+            while os.read(self._wakeup_r, 64):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _can_io_loop(self, dispatch: Optional[DispatchTable], responder: Optional[ResponderCallbacks], stop_event: threading.Event) -> None:
+        """Serve incoming frames and responder deadlines from one epoll wait in the CANReactor thread."""
+        self._apply_listener_scheduling()
+
+        can_fd = None
+        if dispatch is not None:
+            try:
+                can_fd = self.can_module.fileno()
+            except (AttributeError, NotImplementedError, OSError) as e:
+                self.logger.warning("CAN bus does not expose a file descriptor (%s), falling back to polling.", e)
+
+        listener_retry_count = 0
+        epoll = select.epoll()
+        try:
+            epoll.register(self._wakeup_r, select.EPOLLIN)
+            if can_fd is not None:
+                epoll.register(can_fd, select.EPOLLIN)
+
+            while not stop_event.is_set():
+                # Block until a frame arrives, the next response is due, or we are woken up
+                timeout = -1
+                if responder is not None:
+                    timeout = max(0.0, self._next_send_time - time.monotonic())
+                if dispatch is not None and can_fd is None:
+                    timeout = self.listener_poll_interval if timeout < 0 else min(timeout, self.listener_poll_interval)
+
+                events = epoll.poll(timeout)
+                if stop_event.is_set():
+                    break
+
+                can_ready = can_fd is None and dispatch is not None
+                for fd, _ in events:
+                    if fd == self._wakeup_r:
+                        self._drain_wakeups()
+                    elif fd == can_fd:
+                        can_ready = True
+
+                if can_ready:
+                    try:
+                        if can_fd is None:
+                            self.can_module.dispatch_message(dispatch, timeout=0.0)
+                        else:
+                            # Handle everything queued since the wakeup before going back to epoll
+                            self.can_module.drain_messages(dispatch, self.listener_max_batch)
+                        listener_retry_count = 0  # Reset retry count on success
+                    except Exception as e:
+                        listener_retry_count += 1
+                        self.logger.error("CAN listener encountered an error: %s (retry %s/%s)", e, listener_retry_count, self.MAX_RETRIES)
+                        if listener_retry_count >= self.MAX_RETRIES:
+                            self.logger.critical("CAN listener stopping due to repeated errors.")
+                            if can_fd is not None:
+                                epoll.unregister(can_fd)
+                            dispatch = can_fd = None
+
+                if responder is not None and not self._service_responder(responder):
+                    self.logger.critical("CAN responder stopping due to repeated errors.")
+                    responder = None
+
+                if dispatch is None and responder is None:
+                    break
         except Exception as e:
-            self.logger.critical(f"CANListener thread crashed with unhandled exception: {e}")
+            self.logger.critical("CANReactor thread crashed with unhandled exception: %s", e)
+        finally:
+            epoll.close()
 
-    def _send_periodic_responses(self, get_video_status: Callable[[], tuple], get_correctness: Callable[[], int]) -> None:
-        """Send video playback and timer status responses periodically with error handling and retries."""
-        next_send_time = time.time() + self.responder_initial_delay
-        retry_count = 0
-        max_retries = 5
+    def _service_responder(self, responder: ResponderCallbacks) -> bool:
+        """Send a response if one is due; return False once the responder has failed too often."""
+        triggered = self.immediate_response_event.is_set()
+        if triggered:
+            self.immediate_response_event.clear()
 
+        now = time.monotonic()
+        if triggered:
+            self._force_send = True  # Immediate responses signal an event, always send them
+            if now - self._last_sent_time < self.responder_debounce_interval:
+                # Collapse back-to-back triggers into one send at the end of the debounce window
+                self._next_send_time = self._last_sent_time + self.responder_debounce_interval
+                return True
+        elif now < self._next_send_time:
+            return True
+
+        get_video_status, get_correctness = responder
         try:
-            while not self.can_responder_stop_event.is_set():
-                try:
-                    current_time = time.time()
-                    
-                    if self.immediate_response_event.is_set():
-                        self.immediate_response_event.clear()
-                        playback_status, folder_selection, video_number = get_video_status()
-                        correctness = get_correctness()
-                        video_response_data = [0x03, folder_selection, video_number, correctness, 0x00, 0x00, 0x00, 0x00]
-                        self.can_module.send_message(video_response_data)
-                        retry_count = 0  # Reset retry count on success
-
-                        next_send_time = time.time() + self.responder_periodic_interval
-
-                    if current_time >= next_send_time:
-                        playback_status, folder_selection, video_number = get_video_status()
-                        correctness = get_correctness()
-                        video_response_data = [0x03, folder_selection, video_number, correctness, 0x00, 0x00, 0x00, 0x00]
-                        self.can_module.send_message(video_response_data)
-                        retry_count = 0  # Reset retry count on success
-
-                        next_send_time = time.time() + self.responder_periodic_interval
-
-                except Exception as e:
-                    retry_count += 1
-                    self.logger.error(f"CANResponder encountered an error: {e} (retry {retry_count}/{max_retries})")
-                    if retry_count >= max_retries:
-                        self.logger.critical("CANResponder thread stopping due to repeated errors.")
-                        break  # Exit loop if too many consecutive errors
-
-                time.sleep(self.responder_poll_interval)
+            playback_status, folder_selection, video_number = get_video_status()
+            response = self._response_buffer
+            response[1] = folder_selection
+            response[2] = video_number
+            response[3] = get_correctness()
+
+            # Periodic frames are only sent when the status changed or the watchdog interval elapsed
+            if self._force_send or response != self._last_response or now - self._last_sent_time >= self.responder_watchdog_interval:
+                self._send_can_message_with_retry(response)
+                self._last_response = bytes(response)
+                self._last_sent_time = now
+                self._force_send = False
+            self._responder_retry_count = 0  # Reset retry count on success
+            self._next_send_time = time.monotonic() + self.responder_periodic_interval
         except Exception as e:
-            self.logger.critical(f"CANResponder thread crashed with unhandled exception: {e}")
+            self._responder_retry_count += 1
+            self.logger.error("CAN responder encountered an error: %s (retry %s/%s)", e, self._responder_retry_count, self.MAX_RETRIES)
+            if self._responder_retry_count >= self.MAX_RETRIES:
+                return False
+            self._force_send = True
+            self._next_send_time = time.monotonic() + self.responder_poll_interval  # Retry shortly
+        return True
+
+    def _apply_listener_scheduling(self) -> None:
+        """Raise the calling reactor thread's scheduling priority and optionally pin it to a CPU."""
+        if self.listener_rt_priority:
+            try:
+                os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(self.listener_rt_priority))
+                self.logger.debug("CANReactor running with SCHED_FIFO priority %s.", self.listener_rt_priority)
+            except PermissionError:
+                try:
+                    os.nice(-10)
+                    self.logger.debug("SCHED_FIFO not permitted, CANReactor niceness lowered by 10 instead.")
+                except PermissionError:
+                    self.logger.warning("Insufficient permissions to raise CANReactor scheduling priority.")
+            except (AttributeError, OSError) as e:
+                self.logger.warning("Unable to set CANReactor scheduling policy: %s", e)
 
-    def _send_can_message_with_retry(self, can_response_data: List[int], max_retries: int = 3, retry_delay: float = 1.0) -> None:
-        """Attempt to send a CAN message with retries in case of failure."""
-        attempt = 0
-        while attempt < max_retries:
+        if self.listener_cpu is not None:
+            try:
+                os.sched_setaffinity(0, {self.listener_cpu})
+                self.logger.debug("CANReactor pinned to CPU %s.", self.listener_cpu)
+            except (AttributeError, OSError) as e:
+                self.logger.warning("Unable to pin CANReactor to CPU %s: %s", self.listener_cpu, e)
+
+    def _send_can_message_with_retry(self, can_response_data: Union[bytes, bytearray], max_retries: int = 5, retry_delay: float = 0.001, max_retry_delay: float = 0.008) -> None:
+        """Send a CAN message, retrying while the TX queue is full; other errors and the last failure are raised."""
+        # Waits double from 1 ms to the 8 ms cap. This runs on the CAN reactor, which also serves receives,
+        # so the defaults bound the stall to 15 ms (1 + 2 + 4 + 8 ms); _service_responder logs and counts failures
+        delay = retry_delay
+        for attempt in range(max_retries):
             try:
-                # Attempt to send the CAN message using the CAN module
                 self.can_module.send_message(can_response_data)
                 if attempt > 0:
-                    self.logger.info(f"CAN message successfully sent after {attempt} retries: {can_response_data}")
-                else:
-                    self.logger.debug(f"CAN message sent on first attempt: {can_response_data}")
-                return  # Exit early if successful
+                    self.logger.info("CAN message successfully sent after %s retries: %s", attempt, bytes(can_response_data))
+                return
             except CanError as e:
-                # Log the first failure and the final attempt if retries are needed
+                # Only a full TX queue clears by itself; anything else will not be fixed by waiting
+                if not self._is_tx_queue_full(e) or attempt == max_retries - 1:
+                    raise
                 if attempt == 0:
-                    self.logger.warning(f"Initial attempt to send CAN message failed: {e}")
-                elif attempt == max_retries - 1:
-                    self.logger.error(f"Failed to send CAN message after {max_retries} attempts: {can_response_data} - {e}")
-                
-                # Increment attempt and wait before retrying
-                attempt += 1
-                time.sleep(retry_delay)
-        
-        # Log consolidated failure if all retries failed
-        self.logger.critical(f"Unable to send CAN message after {max_retries} attempts due to persistent issues: {can_response_data}")
+                    self.logger.warning("CAN TX queue full, retrying: %s", e)
+
+                # Wait until the socket is writable again, bounded by the current backoff delay
+                self._wait_until_writable(delay)
+                delay = min(delay * 2, max_retry_delay)
+
+    @staticmethod
+    def _is_tx_queue_full(error: CanError) -> bool:
+        """Check whether a CAN error was caused by a full transmit queue (ENOBUFS/EAGAIN)."""
+        return getattr(error, "error_code", None) in (errno.ENOBUFS, errno.EAGAIN) or "No buffer space" in str(error)
+
+    def _wait_until_writable(self, timeout: float) -> None:
+        """Block until the CAN socket accepts writes again or the timeout expires."""
+        try:
+            select.select([], [self.can_module.fileno()], [], timeout)
+        except (AttributeError, NotImplementedError, OSError, ValueError):
+            time.sleep(timeout)
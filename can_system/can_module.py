@@ -1,17 +1,46 @@
+import os
 import logging
+import threading
 import can
 import time
 import subprocess
-from typing import List, Optional, Dict
+from .raw_can import RawCANBus
+from typing import Callable, List, NamedTuple, Optional, Dict, Tuple, Union
+
+class CompiledFilter(NamedTuple):
+    """Software filter with its hex strings parsed once, matched with integer comparisons."""
+    name: str
+    id_lo: int
+    id_hi: int
+    width: int      # Number of leading payload bytes the conditions look at
+    care_mask: int  # 0xFF for every payload byte that must match, packed big-endian over `width` bytes
+    expected: int   # Expected payload bytes, packed big-endian over `width` bytes
+    matches: Callable[[int, Union[bytes, bytearray]], bool]  # Specialized predicate, see CANModule._specialize_matcher
+
+# Filter entry used for dispatch: (position in the filter list, compiled filter, handler or None)
+DispatchEntry = Tuple[int, CompiledFilter, Optional[Callable]]
+# Candidate entries keyed by (arbitration_id << 8) | data[0], plus the entries that cannot be keyed
+DispatchTable = Tuple[Dict[int, List[DispatchEntry]], List[DispatchEntry]]
 
 class CANModule:
+    # Filters spanning more IDs than this are matched through the fallback list instead of being keyed
+    MAX_KEYED_ID_RANGE = 64
+    IFF_UP = 0x1  # Interface flag from <linux/if.h>, as exposed in /sys/class/net/<channel>/flags
+
     def __init__(self, config: dict) -> None:
         """Initialize CANModule with the provided configuration."""
         self.config = config
         self.device_id = int(self.config["device_id"], 16)
+        self._device_id_hex = hex(self.device_id)
+        # Reused for every send. The responder sends from the CAN reactor, shutdown_system from the Tkinter
+        # thread, so filling and sending it is serialized by _tx_lock
+        self._tx_message = can.Message(arbitration_id=self.device_id, data=bytearray(8), is_extended_id=False)
+        self._tx_lock = threading.Lock()
         self.logger = logging.getLogger(__name__)
         self.bus = None
-        self.hw_filters: Optional[List[Dict[str, int]]] = self.config.get("hardware_filters", None)
+        # Parsed once here; reinitialize_can and every filter update reuse the integer form
+        self.hw_filters: List[Dict[str, int]] = self._parse_hw_filters(self.config.get("hardware_filters") or [])
+        self._stats_fds: Optional[Tuple[int, int]] = None  # Preopened rx_errors/tx_errors sysfs counters
         self._initialize_can_module()
 
     def _initialize_can_module(self) -> None:
@@ -22,158 +51,357 @@ class CANModule:
 
     def _check_and_setup_interface(self) -> None:
         """Check if the CAN interface is up, and bring it up if it is down."""
+        # Read the interface flags from sysfs instead of spawning a shell running `ip link show | grep`
+        flags_file = f"/sys/class/net/{self.config['channel']}/flags"
         try:
-            command = f"ip link show {self.config['channel']} | grep 'state UP'"
-            result = subprocess.run(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            if result.returncode != 0:
-                # Check specific error details from `stderr`
-                if "No such device" in result.stderr.decode():
-                    self.logger.error(f"CAN interface '{self.config['channel']}' does not exist.")
-                    raise RuntimeError(f"Interface '{self.config['channel']}' not found.")
-                elif "Permission denied" in result.stderr.decode():
-                    self.logger.error(f"Insufficient permissions to check CAN interface '{self.config['channel']}'.")
-                    raise PermissionError("Permission denied while accessing the CAN interface status.")
-                else:
-                    self.logger.debug(f"CAN interface '{self.config['channel']}' is down, attempting to bring it up.")
-                    self._bring_interface_up()
-            else:
-                self.logger.debug(f"CAN interface '{self.config['channel']}' is already up.")
-        except subprocess.SubprocessError as e:
-            self.logger.error(f"Failed to check or bring up CAN interface: {e}")
+            with open(flags_file, "rb") as flags_f:
+                flags = int(flags_f.read(), 16)
+        except FileNotFoundError:
+            self.logger.error("CAN interface '%s' does not exist.", self.config['channel'])
+            raise RuntimeError(f"Interface '{self.config['channel']}' not found.")
+        except PermissionError:
+            self.logger.error("Insufficient permissions to check CAN interface '%s'.", self.config['channel'])
+            raise PermissionError("Permission denied while accessing the CAN interface status.")
+        except (OSError, ValueError) as e:
+            self.logger.error("Failed to check or bring up CAN interface: %s", e)
             raise
 
+        if flags & self.IFF_UP:
+            self.logger.debug("CAN interface '%s' is already up.", self.config['channel'])
+        else:
+            self.logger.debug("CAN interface '%s' is down, attempting to bring it up.", self.config['channel'])
+            self._bring_interface_up()
+
     def _check_bus_status(self) -> None:
         """Check if the CAN bus is experiencing transmission or reception errors and reset if necessary."""
-        rx_errors_file = f"/sys/class/net/{self.config['channel']}/statistics/rx_errors"
-        tx_errors_file = f"/sys/class/net/{self.config['channel']}/statistics/tx_errors"
-
         try:
-            with open(rx_errors_file, "r") as rx_f, open(tx_errors_file, "r") as tx_f:
-                rx_errors = int(rx_f.read().strip())
-                tx_errors = int(tx_f.read().strip())
+            rx_errors, tx_errors = self._read_error_counters()
 
             if rx_errors > 0 or tx_errors > 0:
-                self.logger.debug(f"CAN bus errors detected (rx_errors: {rx_errors}, tx_errors: {tx_errors}), resetting.")
+                self.logger.debug("CAN bus errors detected (rx_errors: %s, tx_errors: %s), resetting.", rx_errors, tx_errors)
                 self._bring_interface_down()
-                time.sleep(5)  # Cooldown period before bringing the interface back up
+                self._wait_for_operstate(False, 5.0)  # Wait for the interface to report down, at most 5 s
                 self._bring_interface_up()
-                time.sleep(5)  # Additional wait to allow interface to stabilize
+                self._wait_for_operstate(True, 5.0)  # Wait for the interface to stabilize, at most 5 s
             else:
                 self.logger.debug("No CAN bus errors detected.")
 
         except FileNotFoundError as e:
-            self.logger.error(f"Error file not found: {e}. This may indicate a misconfiguration or missing files for the interface '{self.config['channel']}'.")
+            self.logger.error("Error file not found: %s. This may indicate a misconfiguration or missing files for the interface '%s'.", e, self.config['channel'])
         except PermissionError as e:
-            self.logger.error(f"Permission denied when accessing error files for CAN interface '{self.config['channel']}': {e}")
+            self.logger.error("Permission denied when accessing error files for CAN interface '%s': %s", self.config['channel'], e)
         except Exception as e:
-            self.logger.error(f"Unexpected error while checking or resetting CAN bus state: {e}")
+            self.logger.error("Unexpected error while checking or resetting CAN bus state: %s", e)
             
+    def _wait_for_operstate(self, up: bool, timeout: float, poll_interval: float = 0.05) -> bool:
+        """Poll /sys/class/net/<channel>/operstate until the link is up (or down), returning False on timeout."""
+        operstate_file = f"/sys/class/net/{self.config['channel']}/operstate"
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                with open(operstate_file, "rb") as operstate_f:
+                    operstate = operstate_f.read().strip()
+                # Virtual CAN links report "unknown" while up
+                if (operstate in (b"up", b"unknown")) == up:
+                    return True
+            except OSError:
+                pass  # The interface may briefly disappear while it is being reconfigured
+            if time.monotonic() >= deadline:
+                self.logger.warning("CAN interface '%s' did not report %s within %.1f s.", self.config['channel'], "up" if up else "down", timeout)
+                return False
+            time.sleep(poll_interval)
+
+    def _open_stats_fds(self) -> Tuple[int, int]:
+        """Open the rx_errors and tx_errors sysfs counters once; they refresh on every read."""
+        stats_dir = f"/sys/class/net/{self.config['channel']}/statistics"
+        rx_fd = os.open(f"{stats_dir}/rx_errors", os.O_RDONLY)
+        try:
+            tx_fd = os.open(f"{stats_dir}/tx_errors", os.O_RDONLY)
+        except OSError:
+            os.close(rx_fd)
+            raise
+        return rx_fd, tx_fd
+
+    def _close_stats_fds(self) -> None:
+        """Close the preopened sysfs counters."""
+        if self._stats_fds is not None:
+            for fd in self._stats_fds:
+                os.close(fd)
+            self._stats_fds = None
+
+    def _read_error_counters(self) -> Tuple[int, int]:
+        """Sample the rx/tx error counters with os.pread on the preopened sysfs fds."""
+        if self._stats_fds is None:
+            self._stats_fds = self._open_stats_fds()
+        try:
+            rx_fd, tx_fd = self._stats_fds
+            return int(os.pread(rx_fd, 32, 0)), int(os.pread(tx_fd, 32, 0))
+        except OSError:
+            # The interface was re-created and the fds went stale, reopen them once
+            self._close_stats_fds()
+            self._stats_fds = self._open_stats_fds()
+            rx_fd, tx_fd = self._stats_fds
+            return int(os.pread(rx_fd, 32, 0)), int(os.pread(tx_fd, 32, 0))
+
     def _bring_interface_down(self) -> None:
         """Bring the CAN interface down."""
         try:
-            command = f"sudo ip link set {self.config['channel']} down"
-            subprocess.run(command, shell=True, check=True)
-            self.logger.debug(f"CAN interface '{self.config['channel']}' brought down.")
-        except subprocess.SubprocessError as e:
-            self.logger.error(f"Failed to bring down CAN interface: {e}")
+            subprocess.run(["sudo", "ip", "link", "set", self.config['channel'], "down"], check=True)
+            self.logger.debug("CAN interface '%s' brought down.", self.config['channel'])
+        except (subprocess.SubprocessError, OSError) as e:
+            self.logger.error("Failed to bring down CAN interface: %s", e)
 
     def _bring_interface_up(self, retries=3) -> None:
         """Bring the CAN interface up with retries."""
+        last_error = None
         for attempt in range(retries):
             try:
-                # Setting CAN bitrate and bringing it up
-                command_bitrate = f"sudo ip link set {self.config['channel']} type can bitrate {self.config['bitrate']}"
-                subprocess.run(command_bitrate, shell=True, check=True)
-
-                command_up = f"sudo ip link set {self.config['channel']} up"
-                subprocess.run(command_up, shell=True, check=True)
+                # Setting CAN bitrate and bringing it up in a single `ip` call, without a shell;
+                # `up` must come before `type`, everything after `type can` is parsed as CAN options
+                subprocess.run(
+                    ["sudo", "ip", "link", "set", self.config['channel'], "up", "type", "can",
+                     "bitrate", str(self.config['bitrate'])],
+                    check=True
+                )
 
-                self.logger.debug(f"CAN interface '{self.config['channel']}' brought up successfully.")
+                self.logger.debug("CAN interface '%s' brought up successfully.", self.config['channel'])
                 return
-            except subprocess.SubprocessError as e:
-                self.logger.error(f"Attempt {attempt+1}/{retries}: Failed to bring up CAN interface: {e}")
+            except (subprocess.SubprocessError, OSError) as e:
+                # OSError covers a missing `sudo` or `ip` binary
+                last_error = e
+                self.logger.error("Attempt %s/%s: Failed to bring up CAN interface: %s", attempt+1, retries, e)
                 if attempt < retries - 1:
                     time.sleep(2)  # Wait before retrying
-        raise RuntimeError(f"Failed to bring up CAN interface after {retries} attempts: {e}")
+        raise RuntimeError(f"Failed to bring up CAN interface after {retries} attempts: {last_error}")
 
-    def _setup_can_interface(self) -> can.Bus:
+    def _setup_can_interface(self) -> Union[can.Bus, RawCANBus]:
         """Set up the CAN interface with the provided configuration."""
         try:
-            # Process hardware filters only once during setup if they are provided
-            if self.hw_filters:
-                for hw_filter in self.hw_filters:
-                    hw_filter['can_id'] = int(hw_filter['can_id'], 16)
-                    hw_filter['can_mask'] = int(hw_filter['can_mask'], 16)
-                    
+            # Let the kernel drop unrelated frames from the start, before a listener is configured
+            can_filters = self._kernel_filters(self.config.get("software_filters"))
+
+            if self.config.get("raw_socket", False):
+                # Pack/unpack can_frame structs directly on an AF_CAN socket, skipping python-can's Message handling
+                bus = RawCANBus(self.config['channel'], can_filters)
+                self.logger.info("CAN interface '%s' initialized on a raw socket.", self.config['channel'])
+                return bus
+
             bus = can.interface.Bus(
                 channel=self.config['channel'],
                 interface=self.config['interface'],
                 bitrate=self.config['bitrate'],
-                can_filters=self.hw_filters if self.hw_filters else None
+                can_filters=can_filters
             )
-            self.logger.info(f"CAN interface '{self.config['channel']}' initialized.")
+            self.logger.info("CAN interface '%s' initialized.", self.config['channel'])
             return bus
         except Exception as e:
-            self.logger.error(f"Failed to initialize CAN interface: {e}")
+            self.logger.error("Failed to initialize CAN interface: %s", e)
             raise
 
-    def send_message(self, data: List[int]) -> None:
+    def send_message(self, data: Union[List[int], bytes, bytearray]) -> None:
         """Send a CAN message."""
         try:
-            message = can.Message(arbitration_id=self.device_id, data=data, is_extended_id=False)
-            self.bus.send(message)
-            self.logger.debug(f"Sent CAN message with ID '{hex(self.device_id)}' and data '{data}'.")
+            with self._tx_lock:
+                message = self._tx_message
+                message.data[:] = data  # python-can takes the frame length from len(data)
+                message.dlc = len(message.data)
+                self.bus.send(message)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Sent CAN message with ID '%s' and data '%s'.", self._device_id_hex, data)
         except can.CanError as e:
-            self.logger.error(f"Failed to send CAN message: {e}")
+            self.logger.error("Failed to send CAN message: %s", e)
             raise
 
-    def handle_can_message(self, filters: List[dict], can_filter_to_handler: dict) -> None:
-        """Receive and handle a CAN message based on the configured filters."""
+    def apply_kernel_filters(self, filters: List[dict]) -> None:
+        """Install kernel filters covering the hardware filters and the ID ranges of the software filters."""
+        can_filters = self._kernel_filters(filters)
+        self.bus.set_filters(can_filters)
+        self.logger.debug("Installed %s kernel CAN filters.", len(can_filters or []))
+
+    def _kernel_filters(self, filters: Optional[List[dict]]) -> Optional[List[Dict[str, int]]]:
+        """Union the configured hardware filters with (can_id, can_mask) pairs covering the software filters' ID ranges."""
+        can_filters = list(self.hw_filters)
+
+        range_filters = []
+        for compiled in self.compile_filters(filters or []):
+            if compiled is None:
+                range_filters = []  # Don't narrow the filter set with ranges a handler may need frames outside of
+                break
+            range_filters.extend(self._id_range_to_masks(compiled.id_lo, compiled.id_hi))
+        else:
+            seen = {(f['can_id'], f['can_mask'], f.get('extended', False)) for f in can_filters}
+            for range_filter in range_filters:
+                key = (range_filter['can_id'], range_filter['can_mask'], range_filter['extended'])
+                if key not in seen:
+                    seen.add(key)
+                    can_filters.append(range_filter)
+
+        if not self.hw_filters and not range_filters:
+            return None  # Receive everything
+        return can_filters
+
+    def _parse_hw_filters(self, hw_filters: List[dict]) -> List[Dict[str, int]]:
+        """Convert the configured hardware filters' hex strings to ints, without mutating the (shared) configuration."""
         try:
-            message = self.bus.recv(timeout=1.0)
+            return [
+                {**hw_filter, 'can_id': int(hw_filter['can_id'], 16), 'can_mask': int(hw_filter['can_mask'], 16)}
+                for hw_filter in hw_filters
+            ]
+        except (KeyError, TypeError, ValueError) as e:
+            self.logger.error("Invalid hardware filter configuration: %s", e)
+            raise
+
+    @staticmethod
+    def _id_range_to_masks(low: int, high: int) -> List[Dict[str, int]]:
+        """Split an inclusive 11-bit ID range into the minimal set of (can_id, can_mask) prefix filters."""
+        masks = []
+        while low <= high:
+            # Largest aligned block starting at `low` that does not run past `high`
+            size = low & -low if low else 0x800
+            while size > high - low + 1:
+                size >>= 1
+            masks.append({"can_id": low, "can_mask": 0x7FF & ~(size - 1), "extended": False})
+            low += size
+        return masks
+
+    def fileno(self) -> int:
+        """Return the file descriptor of the underlying CAN socket, for use with select/epoll."""
+        return self.bus.fileno()
+
+    def compile_filters(self, filters: List[dict]) -> List[Optional[CompiledFilter]]:
+        """Parse the software filters once; invalid filters compile to None and never match."""
+        return [self._compile_filter(filter) for filter in filters]
+
+    def _compile_filter(self, filter: dict) -> Optional[CompiledFilter]:
+        """Turn a filter's id_range and payload_conditions into integers and byte masks."""
+        try:
+            id_lo, id_hi = (int(x, 16) for x in filter["id_range"])
+            conditions = filter.get("payload_conditions") or []
+            width = care_mask = expected = 0
+            for index, expected_value in enumerate(conditions):
+                care_mask <<= 8
+                expected <<= 8
+                if expected_value != "*" and expected_value is not None:
+                    care_mask |= 0xFF
+                    expected |= int(expected_value, 16)
+                    width = index + 1
+            # Trailing wildcards do not require the payload to be that long
+            shift = 8 * (len(conditions) - width)
+            care_mask >>= shift
+            expected >>= shift
+            matches = self._specialize_matcher(filter["name"], id_lo, id_hi, width, care_mask, expected)
+            return CompiledFilter(filter["name"], id_lo, id_hi, width, care_mask, expected, matches)
+        except (KeyError, ValueError) as e:
+            self.logger.error("Invalid filter '%s', it will never match: %s. Check id_range and payload_conditions format.", filter.get('name'), e)
+            return None
+
+    def _specialize_matcher(self, name: str, id_lo: int, id_hi: int, width: int, care_mask: int, expected: int) -> Callable[[int, Union[bytes, bytearray]], bool]:
+        """Build a predicate for one filter with its bounds and payload bound as constants, picking the cheapest check for its shape."""
+        log_error = self.logger.error
+
+        def payload_too_short(data) -> bool:
+            log_error("Index error: payload length mismatch. Message data: %s, filter: %s", data, name)
+            return False
+
+        if not care_mask:
+            # Only the ID range matters
+            def matches(arbitration_id, data) -> bool:
+                return id_lo <= arbitration_id <= id_hi
+        elif care_mask == (1 << (8 * width)) - 1:
+            # No wildcards before the last condition: a plain prefix compare, no int conversion
+            prefix = expected.to_bytes(width, "big")
+
+            def matches(arbitration_id, data) -> bool:
+                if not id_lo <= arbitration_id <= id_hi:
+                    return False
+                if data.startswith(prefix):
+                    return True
+                return len(data) < width and payload_too_short(data)
+        else:
+            # Every byte selected by the care mask must equal the expected byte
+            def matches(arbitration_id, data) -> bool:
+                if not id_lo <= arbitration_id <= id_hi:
+                    return False
+                if len(data) < width:
+                    return payload_too_short(data)
+                return (int.from_bytes(data[:width], "big") ^ expected) & care_mask == 0
+        return matches
+
+    def build_dispatch_table(self, filters: List[dict], can_filter_to_handler: dict) -> DispatchTable:
+        """Index the filters by (arbitration_id << 8) | data[0] so a frame only checks the filters it can match."""
+        keyed: Dict[int, List[DispatchEntry]] = {}
+        fallback: List[DispatchEntry] = []
+        for index, compiled in enumerate(self.compile_filters(filters)):
+            if compiled is None:
+                continue
+            entry = (index, compiled, can_filter_to_handler.get(compiled.name))
+            keys = self._dispatch_keys(compiled)
+            if keys is None:
+                fallback.append(entry)
+            else:
+                for key in keys:
+                    keyed.setdefault(key, []).append(entry)
+
+        # Merge the fallback filters into every keyed list, keeping the configured filter order
+        table = {key: sorted(entries + fallback, key=lambda e: e[0]) for key, entries in keyed.items()}
+        self.logger.debug("Built CAN dispatch table with %s keys and %s fallback filters.", len(table), len(fallback))
+        return table, fallback
+
+    def _dispatch_keys(self, compiled: CompiledFilter) -> Optional[List[int]]:
+        """Return the dispatch keys a filter can match, or None if it has to be checked for every frame."""
+        first_byte_shift = 8 * (compiled.width - 1)
+        if compiled.width == 0 or not (compiled.care_mask >> first_byte_shift) & 0xFF:
+            return None  # First payload byte is a wildcard
+        if compiled.id_hi - compiled.id_lo >= self.MAX_KEYED_ID_RANGE:
+            return None
+        first_byte = (compiled.expected >> first_byte_shift) & 0xFF
+        return [(arbitration_id << 8) | first_byte for arbitration_id in range(compiled.id_lo, compiled.id_hi + 1)]
+
+    def dispatch_message(self, dispatch: DispatchTable, timeout: float = 1.0) -> None:
+        """Receive a CAN message and hand it to the handler of the first matching filter."""
+        try:
+            message = self.bus.recv(timeout=timeout)
             if message:
-                self._process_message(message, filters, can_filter_to_handler)
+                self._dispatch(message, dispatch)
         except can.CanError as e:
-            self.logger.error(f"CAN bus error: {e}")
-
-    def _process_message(self, message: can.Message, filters: List[dict], can_filter_to_handler: dict) -> None:
-        """Process a received CAN message by finding the appropriate handler."""
-        handler_name = self._match_filter_to_handler(message, filters)
-        if handler_name:
-            handler = can_filter_to_handler.get(handler_name)
-            if handler:
-                handler(message.arbitration_id, message.data)
-
-    def _match_filter_to_handler(self, message: can.Message, filters: List[dict]) -> Optional[str]:
-        """Find a matching filter for the received message."""
-        for filter in filters:
-            if self._is_message_matching_filter(message, filter):
-                return filter['name']
-        return None
-
-    def _is_message_matching_filter(self, message: can.Message, filter: dict) -> bool:
-        """Check if a message matches the given filter conditions."""
+            self.logger.error("CAN bus error: %s", e)
+
+    def drain_messages(self, dispatch: DispatchTable, max_batch: int = 32) -> int:
+        """Dispatch every frame already queued on the socket, up to max_batch, without blocking."""
+        count = 0
         try:
-            # Check if the arbitration ID falls within the specified range
-            id_range = [int(x, 16) for x in filter["id_range"]]
-            if not (id_range[0] <= message.arbitration_id <= id_range[1]):
-                return False
+            if isinstance(self.bus, RawCANBus):
+                # One recvmmsg call for the whole batch instead of a recv per frame
+                messages = self.bus.recv_many(max_batch)
+                for message in messages:
+                    self._dispatch(message, dispatch)
+                return len(messages)
 
-            # Check payload conditions
-            for index, expected_value in enumerate(filter["payload_conditions"]):
-                if expected_value != "*" and expected_value is not None:
-                    # Verify each condition matches the expected value in the payload
-                    if message.data[index] != int(expected_value, 16):
-                        return False
-
-            # All conditions met, return True
-            return True
-        except ValueError as e:
-            self.logger.error(f"Value error when processing filter conditions: {e}. Check payload_conditions format.")
-            return False
-        except IndexError as e:
-            self.logger.error(f"Index error: payload length mismatch. Message data: {message.data}, filter: {filter}")
-            return False
+            while count < max_batch:
+                message = self.bus.recv(timeout=0.0)
+                if message is None:
+                    break
+                count += 1
+                self._dispatch(message, dispatch)
+        except can.CanError as e:
+            self.logger.error("CAN bus error: %s", e)
+        return count
+
+    def _dispatch(self, message: can.Message, dispatch: DispatchTable) -> None:
+        """Run the handler of the first filter matching the message, using the dispatch table."""
+        arbitration_id, data = message.arbitration_id, message.data
+        for _, compiled, handler in self._candidates(message, dispatch):
+            if compiled.matches(arbitration_id, data):
+                if handler:
+                    handler(arbitration_id, data)
+                return
+
+    @staticmethod
+    def _candidates(message: can.Message, dispatch: DispatchTable) -> List[DispatchEntry]:
+        """Return the filters a message can match, in configured order."""
+        table, fallback = dispatch
+        data = message.data
+        return table.get((message.arbitration_id << 8) | data[0], fallback) if data else fallback
 
     def shutdown(self) -> None:
         """Shutdown the CAN interface."""
@@ -184,8 +412,9 @@ class CANModule:
                 self.logger.info("CAN interface shut down successfully.")
             else:
                 self.logger.warning("CAN bus is not active, skipping shutdown.")
+            self._close_stats_fds()
         except Exception as e:
-            self.logger.error(f"Error during CAN shutdown: {e}")
+            self.logger.error("Error during CAN shutdown: %s", e)
 
     def reinitialize_can(self) -> None:
         """Re-initialize CAN bus after shutdown."""
@@ -194,5 +423,5 @@ class CANModule:
             self._initialize_can_module()  # Re-initialize the module
             self.logger.info("CAN interface re-initialized successfully.")
         except Exception as e:
-            self.logger.error(f"Error reinitializing CAN interface: {e}")
+            self.logger.error("Error reinitializing CAN interface: %s", e)
             raise
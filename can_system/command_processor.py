@@ -1,56 +1,142 @@
-import queue
+import os
+import fcntl
+from collections import deque
+import time
 import logging
 import threading
-from typing import Callable, Tuple
+import tkinter as tk
+from typing import Callable, Deque, Tuple
 
 class CommandProcessor:
+    MIN_POLL_INTERVAL_MS = 1
+    MAX_POLL_INTERVAL_MS = 50
+    DRAIN_BUDGET_S = 0.005  # Upper bound on time spent draining per tick, keeps the UI responsive
+
     def __init__(self, root) -> None:
         """Initialize the CommandProcessor with a command queue and logger."""
         self.root = root
         self.logger = logging.getLogger(__name__)  # Initialize logger for the CommandProcessor module
-        self.command_queue: queue.Queue[Tuple[Callable, Tuple]] = queue.Queue()
+        # deque.append/popleft are atomic, so the CAN thread hands commands over without taking a lock
+        self.command_queue: Deque[Tuple[Callable, Tuple]] = deque()
         self.processing = False
         self.lock = threading.Lock()
-        self.worker_thread: threading.Thread = None
+        self._poll_ms = self.MIN_POLL_INTERVAL_MS
+        self._after_id = None
+
+        # Self-pipe used to wake the Tkinter event loop as soon as a command is enqueued
+        self._read_fd, self._write_fd = os.pipe()
+        for fd in (self._read_fd, self._write_fd):
+            flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+            fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+        self._wakeup_enabled = False
+
+    @property
+    def wakeup_fd(self) -> int:
+        """Non-blocking write end of the wakeup pipe; any byte written to it makes the Tkinter loop drain the queue."""
+        return self._write_fd
 
     def enqueue_command(self, command: Callable, *args) -> None:
         """Add a command to the queue for later execution."""
-        self.logger.debug(f"Enqueueing command '{command.__name__}' with arguments: {args}")
-        self.command_queue.put((command, args))
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Enqueueing command '%s' with arguments: %s", command.__name__, args)
+        self.command_queue.append((command, args))
+        write_fd = self._write_fd
+        if write_fd is None:
+            return  # Closed, nothing is listening any more
+        try:
+            os.write(write_fd, b'x')
+        except BlockingIOError:
+            # Pipe is full, a wakeup is already pending
+            pass
+        except OSError:
+            pass  # Closed by close() between the check and the write
 
     def process_queue(self) -> None:
-        """Start processing commands in the queue."""
+        """Start processing commands in the queue on the Tkinter main loop."""
         with self.lock:
             if not self.processing:
                 self.processing = True
-                self.worker_thread = threading.Thread(target=self._process_commands, daemon=True)
-                self.worker_thread.start()
+                self._poll_ms = self.MIN_POLL_INTERVAL_MS
+                try:
+                    self.root.createfilehandler(self._read_fd, tk.READABLE, self._on_command_ready)
+                    self._wakeup_enabled = True
+                except (AttributeError, tk.TclError):
+                    # File handlers are not available on this platform, fall back to polling
+                    self._wakeup_enabled = False
+                self._after_id = self.root.after(self._poll_ms, self._process_commands)
                 self.logger.info("Started command processing.")
 
+    def _on_command_ready(self, fd, mask) -> None:
+        """Tkinter file handler: clear the wakeup pipe and drain the queue immediately."""
+        try:
+            os.read(fd, 4096)
+        except BlockingIOError:
+            pass
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self._process_commands()
+
     def _process_commands(self) -> None:
-        """Process commands from the queue in a loop."""
-        while self.processing:
+        """Drain the queue within the tick budget, then reschedule with an adaptive poll interval."""
+        self._after_id = None
+        if not self.processing:
+            return
+
+        drained = 0
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+        deadline = time.monotonic() + self.DRAIN_BUDGET_S
+        while time.monotonic() < deadline:
             try:
-                command, args = self.command_queue.get(timeout=1)  # Timeout to allow periodic checking
-                self.logger.debug(f"Scheduling command '{command.__name__}' with arguments: {args} to run in the main thread.")
-                self.root.after(0, lambda cmd=command, cmd_args=args: self._execute_command(cmd, *cmd_args))
-                self.command_queue.task_done()
-            except queue.Empty:
-                # No command to process; just continue
-                continue
-            except Exception as e:
-                self.logger.error(f"Error processing command '{command.__name__}': {e}")
+                command, args = self.command_queue.popleft()
+            except IndexError:
+                break
+            if debug:
+                self.logger.debug("Executing command '%s' with arguments: %s in the main thread.", command.__name__, args)
+            self._execute_command(command, *args)
+            drained += 1
+
+        if self._wakeup_enabled:
+            # New commands wake us through the pipe; if the budget ran out, continue once pending UI events are handled
+            if self.command_queue:
+                self._after_id = self.root.after_idle(self._process_commands)
+            return
+
+        # Poll eagerly while commands keep arriving, back off exponentially when idle
+        if drained:
+            self._poll_ms = self.MIN_POLL_INTERVAL_MS
+        else:
+            self._poll_ms = min(self._poll_ms * 2, self.MAX_POLL_INTERVAL_MS)
+
+        if self.processing:
+            self._after_id = self.root.after(self._poll_ms, self._process_commands)
 
     def _execute_command(self, command: Callable, *args) -> None:
         """Execute a command safely, catching any errors."""
         try:
             command(*args)
         except Exception as e:
-            self.logger.error(f"Error executing command '{command.__name__}': {e}")
+            self.logger.error("Error executing command '%s': %s", command.__name__, e)
 
     def stop_processing(self) -> None:
         with self.lock:
             if self.processing:
                 self.processing = False
-                self.command_queue.join()  # Wait for the queue to be empty
+                if self._after_id is not None:
+                    self.root.after_cancel(self._after_id)
+                    self._after_id = None
+                if self._wakeup_enabled:
+                    self.root.deletefilehandler(self._read_fd)
+                    self._wakeup_enabled = False
                 self.logger.info("Stopped command processing.")
+
+    def close(self) -> None:
+        """Stop processing and close the wakeup pipe; call once no other thread enqueues commands any more."""
+        self.stop_processing()  # No-op when already stopped, otherwise must run on the Tkinter thread
+        with self.lock:
+            if self._read_fd is None:
+                return
+            read_fd, write_fd = self._read_fd, self._write_fd
+            self._read_fd = self._write_fd = None
+        os.close(read_fd)
+        os.close(write_fd)
+        self.logger.debug("Command processor wakeup pipe closed.")
@@ -0,0 +1,164 @@
+import ctypes
+import ctypes.util
+import errno
+import select
+import socket
+import struct
+import logging
+import can
+from typing import Dict, List, NamedTuple, Optional, Union
+
+class _IOVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_IOVec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+MSG_DONTWAIT = 0x40
+
+def _load_recvmmsg():
+    """Bind recvmmsg from libc, which the socket module does not expose."""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        recvmmsg = libc.recvmmsg
+    except (OSError, AttributeError):
+        return None
+    recvmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint, ctypes.c_int, ctypes.c_void_p]
+    recvmmsg.restype = ctypes.c_int
+    return recvmmsg
+
+_recvmmsg = _load_recvmmsg()
+
+class _FrameBatch:
+    """Preallocated can_frame buffers with the iovec/mmsghdr arrays pointing into them."""
+
+    def __init__(self, size: int, frame_size: int) -> None:
+        self.size = size
+        self.frame_size = frame_size
+        self.buffer = (ctypes.c_char * (size * frame_size))()
+        self.iovecs = (_IOVec * size)()
+        self.msgs = (_MMsgHdr * size)()
+        base = ctypes.addressof(self.buffer)
+        for i in range(size):
+            self.iovecs[i].iov_base = base + i * frame_size
+            self.iovecs[i].iov_len = frame_size
+            self.msgs[i].msg_hdr.msg_iov = ctypes.pointer(self.iovecs[i])
+            self.msgs[i].msg_hdr.msg_iovlen = 1
+
+class RawFrame(NamedTuple):
+    """Received CAN frame, with the same attribute names the dispatch code reads from can.Message."""
+    arbitration_id: int
+    data: bytes
+    is_extended_id: bool
+
+class RawCANBus:
+    """Minimal SocketCAN bus that packs and unpacks `struct can_frame` directly instead of going through python-can."""
+    FRAME = struct.Struct("=IB3x8s")  # struct can_frame: can_id, len, pad/res0/len8_dlc, data[8]
+
+    def __init__(self, channel: str, can_filters: Optional[List[Dict[str, int]]] = None, batch_size: int = 32) -> None:
+        """Open and bind a raw CAN socket on the given channel."""
+        self.channel = channel
+        self.logger = logging.getLogger(__name__)
+        self._tx_buf = bytearray(self.FRAME.size)
+        self._rx_buf = bytearray(self.FRAME.size)
+        self._rx_batch = _FrameBatch(batch_size, self.FRAME.size) if _recvmmsg else None
+        self._sock = socket.socket(socket.AF_CAN, socket.SOCK_RAW, socket.CAN_RAW)
+        try:
+            self._sock.setblocking(False)  # Waiting is done with select/epoll on fileno()
+            self.set_filters(can_filters)
+            self._sock.bind((channel,))
+        except OSError:
+            self._sock.close()
+            raise
+        self.logger.debug("Raw CAN socket bound to '%s'.", channel)
+
+    def fileno(self) -> int:
+        """Return the socket's file descriptor."""
+        return self._sock.fileno()
+
+    def set_filters(self, can_filters: Optional[List[Dict[str, int]]] = None) -> None:
+        """Install kernel filters in python-can's format; None receives every frame."""
+        filter_data = []
+        for can_filter in can_filters or [{"can_id": 0, "can_mask": 0}]:
+            can_id, can_mask = can_filter["can_id"], can_filter["can_mask"]
+            if "extended" in can_filter:
+                can_mask |= socket.CAN_EFF_FLAG
+                if can_filter["extended"]:
+                    can_id |= socket.CAN_EFF_FLAG
+            filter_data += (can_id, can_mask)
+        self._sock.setsockopt(socket.SOL_CAN_RAW, socket.CAN_RAW_FILTER, struct.pack(f"={len(filter_data)}I", *filter_data))
+
+    def send(self, message: can.Message, timeout: Optional[float] = None) -> None:
+        """Pack the message into the reused frame buffer and write it to the socket."""
+        can_id = message.arbitration_id
+        if message.is_extended_id:
+            can_id |= socket.CAN_EFF_FLAG
+        self._send_frame(can_id, message.data)
+
+    def _send_frame(self, can_id: int, data: Union[bytes, bytearray]) -> None:
+        """Write a single frame, can_id already carrying the EFF flag if needed."""
+        self.FRAME.pack_into(self._tx_buf, 0, can_id, len(data), bytes(data))
+        try:
+            self._sock.send(self._tx_buf)
+        except OSError as e:
+            # EAGAIN on a non-blocking socket means the same as ENOBUFS: the TX queue is full
+            error_code = errno.ENOBUFS if e.errno == errno.EAGAIN else e.errno
+            raise can.CanOperationError(f"Failed to transmit: {e}", error_code)
+
+    def recv(self, timeout: Optional[float] = None) -> Optional[RawFrame]:
+        """Return the next frame, waiting up to timeout seconds (None waits forever)."""
+        try:
+            try:
+                self._sock.recv_into(self._rx_buf)
+            except BlockingIOError:
+                if timeout == 0 or not select.select([self._sock], [], [], timeout)[0]:
+                    return None
+                self._sock.recv_into(self._rx_buf)
+        except BlockingIOError:
+            return None
+        except OSError as e:
+            raise can.CanOperationError(f"Failed to receive: {e}", e.errno)
+
+        return self._unpack(self._rx_buf, 0)
+
+    def recv_many(self, max_frames: int) -> List[RawFrame]:
+        """Return up to max_frames frames already queued on the socket, read with a single recvmmsg call."""
+        batch = self._rx_batch
+        if batch is None:
+            frames = []
+            while len(frames) < max_frames:
+                frame = self.recv(timeout=0)
+                if frame is None:
+                    break
+                frames.append(frame)
+            return frames
+
+        count = _recvmmsg(self._sock.fileno(), batch.msgs, min(max_frames, batch.size), MSG_DONTWAIT, None)
+        if count < 0:
+            error_code = ctypes.get_errno()
+            if error_code in (errno.EAGAIN, errno.EINTR):
+                return []
+            raise can.CanOperationError(f"Failed to receive: {errno.errorcode.get(error_code, error_code)}", error_code)
+        return [self._unpack(batch.buffer, i * batch.frame_size) for i in range(count)]
+
+    def _unpack(self, buffer, offset: int) -> RawFrame:
+        """Decode one can_frame from the buffer."""
+        can_id, length, data = self.FRAME.unpack_from(buffer, offset)
+        if can_id & socket.CAN_EFF_FLAG:
+            return RawFrame(can_id & socket.CAN_EFF_MASK, data[:length], True)
+        return RawFrame(can_id & socket.CAN_SFF_MASK, data[:length], False)
+
+    def shutdown(self) -> None:
+        """Close the socket."""
+        self._sock.close()
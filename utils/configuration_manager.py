@@ -1,9 +1,29 @@
 import json
 import os
+import re
 import logging
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
+
+# $name or ${name}, the same forms (and ASCII-only names) os.path.expandvars understands
+_ENV_VAR_RE = re.compile(r'\$(\w+|\{([^}]*)\})', re.ASCII)
+
+def _substitute_env_var(match: re.Match) -> str:
+    """Return the variable's value, or the original text if it is not set."""
+    return os.environ.get(match.group(2) or match.group(1), match.group(0))
 
 class ConfigurationManager:
+    # Parsed configurations shared by all instances, keyed by (path, mtime_ns, size)
+    _cache: Dict[Tuple[str, int, int], dict] = {}
+
+    # Keys required within a section, checked whenever the section is present
+    REQUIRED_KEYS: Tuple[Tuple[str, str], ...] = (
+        ("LOGGING", "file"),
+        ("LOGGING", "level"),
+        ("CAN", "channel"),
+        ("CAN", "bitrate"),
+        ("CAN", "software_filters"),
+    )
+
     def __init__(self, config_path: str, required_sections: Optional[List[str]] = None) -> None:
         """Initialize ConfigurationManager with config file path and required sections."""
         self.config_path = config_path
@@ -13,47 +33,51 @@ class ConfigurationManager:
 
     def _load_and_validate_config(self) -> dict:
         """Load and validate the configuration file."""
-        if not os.path.exists(self.config_path):
-            self.logger.error(f"Configuration file not found: {self.config_path}")
+        try:
+            st = os.stat(self.config_path)
+            # The size catches rewrites within the filesystem's timestamp granularity
+            cache_key = (os.path.abspath(self.config_path), st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            self.logger.error("Configuration file not found: %s", self.config_path)
             raise FileNotFoundError(f"Configuration file not found: '{self.config_path}'.")
 
-        with open(self.config_path, 'r') as file:
-            try:
-                config_data = json.load(file)
-                config_data = self._expand_env_variables(config_data)  # Expand env variables in config
-            except json.JSONDecodeError as e:
-                self.logger.error(f"Failed to parse JSON configuration file: {e}")
-                raise ValueError(f"Failed to parse JSON configuration file: {e}")
+        # Reuse the parsed data as long as the file has not been modified
+        config_data = ConfigurationManager._cache.get(cache_key)
+        if config_data is None:
+            with open(self.config_path, 'rb') as file:
+                try:
+                    config_data = json.loads(file.read())
+                    config_data = self._expand_env_variables(config_data)  # Expand env variables in config
+                except json.JSONDecodeError as e:
+                    self.logger.error("Failed to parse JSON configuration file: %s", e)
+                    raise ValueError(f"Failed to parse JSON configuration file: {e}")
+            self._validate_config(config_data)
+            ConfigurationManager._cache[cache_key] = config_data
+        else:
+            self.logger.debug("Using cached configuration for '%s'.", self.config_path)
+            self._validate_config(config_data)
 
-        self._validate_config(config_data)
         return config_data
 
     def _validate_config(self, config_data: dict) -> None:
         """Ensure that all required sections and their keys are present in the configuration."""
         missing_sections = [section for section in self.required_sections if section not in config_data]
         if missing_sections:
-            self.logger.error(f"Missing required configuration sections: {', '.join(missing_sections)}")
+            self.logger.error("Missing required configuration sections: %s", ', '.join(missing_sections))
             raise ValueError(f"Missing required configuration sections: {', '.join(missing_sections)}")
 
-        # Example: Check for required keys in each section, if necessary
-        required_keys = {
-            "LOGGING": ["file", "level"],
-            "CAN": ["channel", "bitrate", "software_filters"]
-            # Add more as needed
-        }
-
-        for section, keys in required_keys.items():
-            if section in config_data:
-                missing_keys = [key for key in keys if key not in config_data[section]]
-                if missing_keys:
-                    self.logger.error(f"Missing keys in '{section}': {', '.join(missing_keys)}")
-                    raise ValueError(f"Missing keys in '{section}': {', '.join(missing_keys)}")
+        missing_keys = [f"{section}.{key}" for section, key in self.REQUIRED_KEYS
+                        if section in config_data and key not in config_data[section]]
+        if missing_keys:
+            self.logger.error("Missing required configuration keys: %s", ', '.join(missing_keys))
+            raise ValueError(f"Missing required configuration keys: {', '.join(missing_keys)}")
 
     def _expand_env_variables(self, config_data: dict) -> dict:
         """Expand environment variables within the configuration values."""
         def expand_value(value):
             if isinstance(value, str):
-                return os.path.expandvars(value)
+                # Most values hold no variables, skip the regex for them
+                return _ENV_VAR_RE.sub(_substitute_env_var, value) if '$' in value else value
             if isinstance(value, dict):
                 return {k: expand_value(v) for k, v in value.items()}
             if isinstance(value, list):
@@ -2,51 +2,72 @@ import os
 import subprocess
 import shutil
 import sys
+from typing import List
 
-def install_font(font_path: str) -> bool:
+FONT_DIR = "/usr/share/fonts/truetype/custom_fonts"
+
+def install_fonts(font_paths: List[str]) -> bool:
     """
-    Install a font file to the system's font directory and update the font cache.
+    Install font files to the system's font directory and update the font cache once.
 
     Args:
-        font_path (str): The path to the font file to be installed.
+        font_paths (List[str]): The paths to the font files to be installed.
 
     Returns:
-        bool: True if the font was successfully installed, False otherwise.
+        bool: True if all fonts were successfully installed, False otherwise.
     """
     try:
-        if not os.path.isfile(font_path):
-            print(f"Font file not found: {font_path}")
+        missing = [path for path in font_paths if not os.path.isfile(path)]
+        if missing:
+            print(f"Font file not found: {', '.join(missing)}")
             return False
 
-        dest_dir = "/usr/share/fonts/truetype/custom_fonts"
-        os.makedirs(dest_dir, exist_ok=True)
+        os.makedirs(FONT_DIR, exist_ok=True)
 
-        font_name = os.path.basename(font_path)
-        dest_path = os.path.join(dest_dir, font_name)
-        shutil.copy(font_path, dest_path)
-        print(f"Copied {font_name} to {dest_path}")
+        font_names = []
+        for font_path in font_paths:
+            font_name = os.path.basename(font_path)
+            dest_path = os.path.join(FONT_DIR, font_name)
+            # copyfile uses sendfile on Linux and skips copying the source's mode bits
+            shutil.copyfile(font_path, dest_path)
+            os.chmod(dest_path, 0o644)
+            print(f"Copied {font_name} to {dest_path}")
+            font_names.append(font_name)
 
-        subprocess.run(["sudo", "fc-cache", "-f", "-v"], check=True)
+        # Rebuild the cache for the custom directory only, once for all copied fonts
+        subprocess.run(["sudo", "fc-cache", "-f", FONT_DIR], check=True)
         print("Font cache updated.")
 
-        result = subprocess.run(["fc-list", "|", "grep", font_name], capture_output=True, text=True, shell=True)
-        if font_name in result.stdout:
-            print(f"Font {font_name} installed successfully!")
-            return True
-        else:
-            print(f"Font {font_name} installation failed.")
-            return False
+        result = subprocess.run(["fc-list"], capture_output=True, text=True, check=True)
+        failed = [font_name for font_name in font_names if font_name not in result.stdout]
+        for font_name in font_names:
+            if font_name in failed:
+                print(f"Font {font_name} installation failed.")
+            else:
+                print(f"Font {font_name} installed successfully!")
+        return not failed
     except Exception as e:
         print(f"An error occurred: {e}")
         return False
 
+def install_font(font_path: str) -> bool:
+    """
+    Install a single font file, see install_fonts.
+
+    Args:
+        font_path (str): The path to the font file to be installed.
+
+    Returns:
+        bool: True if the font was successfully installed, False otherwise.
+    """
+    return install_fonts([font_path])
+
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python install_font.py /path/to/your/font.ttf")
+    if len(sys.argv) < 2:
+        print("Usage: python install_font.py /path/to/your/font.ttf [more fonts...]")
         sys.exit(1)
 
-    font_path = sys.argv[1]
-    if install_font(font_path):
+    if install_fonts(sys.argv[1:]):
         sys.exit(0)
     else:
         sys.exit(1)
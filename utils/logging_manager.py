@@ -1,14 +1,32 @@
+import atexit
+import queue
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from typing import Optional
 
+# Module logger: the root-level logging.* helpers would call basicConfig() and install a stray
+# StreamHandler if they ran before setup_logging() finished
+logger = logging.getLogger(__name__)
+
+_LEVELS = {
+    "CRITICAL": logging.CRITICAL,
+    "FATAL": logging.CRITICAL,
+    "ERROR": logging.ERROR,
+    "WARNING": logging.WARNING,
+    "WARN": logging.WARNING,
+    "INFO": logging.INFO,
+    "DEBUG": logging.DEBUG,
+    "NOTSET": logging.NOTSET,
+}
+
 class LoggingManager:
     def __init__(self, config: dict) -> None:
         """Initialize the LoggingManager with the provided logging configuration."""
         self.config = config
+        self.queue_listener: Optional[QueueListener] = None
 
     def setup_logging(self) -> None:
-        """Set up the root logger with rotating file and stream handlers."""
+        """Set up the root logger with rotating file and stream handlers, fed through a queue."""
         try:
             log_file = self.config.get("file", "app.log")
             log_level = self._get_log_level(self.config.get("level", "DEBUG"))
@@ -20,17 +38,23 @@ class LoggingManager:
 
             # Ensure no duplicate handlers
             root_logger = logging.getLogger()
-            if not any(isinstance(handler, RotatingFileHandler) for handler in root_logger.handlers):
+            if not any(isinstance(handler, QueueHandler) for handler in root_logger.handlers):
+                formatter = logging.Formatter(log_format)  # Shared by both handlers
+
                 rotating_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count)
                 rotating_handler.setLevel(log_level)
-                rotating_handler.setFormatter(logging.Formatter(log_format))
-                root_logger.addHandler(rotating_handler)
+                rotating_handler.setFormatter(formatter)
 
-            if not any(isinstance(handler, logging.StreamHandler) for handler in root_logger.handlers):
                 stream_handler = logging.StreamHandler()
                 stream_handler.setLevel(log_level)
-                stream_handler.setFormatter(logging.Formatter(log_format))
-                root_logger.addHandler(stream_handler)
+                stream_handler.setFormatter(formatter)
+
+                # Callers only enqueue records; formatting and file/console I/O happen in the listener thread
+                log_queue: queue.SimpleQueue = queue.SimpleQueue()
+                root_logger.addHandler(QueueHandler(log_queue))
+                self.queue_listener = QueueListener(log_queue, rotating_handler, stream_handler, respect_handler_level=True)
+                self.queue_listener.start()
+                atexit.register(self.shutdown)
 
             # Set the root logger level
             root_logger.setLevel(log_level)
@@ -43,12 +67,18 @@ class LoggingManager:
             root_logger.debug("Logging configuration completed successfully.")
 
         except Exception as e:
-            logging.error(f"Error setting up logging: {e}")
+            logger.error("Error setting up logging: %s", e)
+
+    def shutdown(self) -> None:
+        """Flush queued log records and stop the listener thread."""
+        if self.queue_listener is not None:
+            self.queue_listener.stop()
+            self.queue_listener = None
 
     def _get_log_level(self, level: str) -> int:
         """Convert a log level string to a logging level constant, with a default fallback."""
-        try:
-            return getattr(logging, level.upper())
-        except AttributeError:
-            logging.warning(f"Invalid log level '{level}', defaulting to 'DEBUG'.")
+        log_level = _LEVELS.get(level.upper())
+        if log_level is None:
+            logger.warning("Invalid log level '%s', defaulting to 'DEBUG'.", level)
             return logging.DEBUG
+        return log_level
@@ -1,10 +1,7 @@
 import signal
-import os
-import fcntl
 import logging
 import threading
 from typing import Optional, Callable
-import tkinter as tk
 from can_system.command_processor import CommandProcessor
 
 class SignalHandler:
@@ -14,18 +11,13 @@ class SignalHandler:
         self.command_processor = command_processor
         self.logger = logging.getLogger(__name__)
         self.custom_shutdown_callback = custom_shutdown_callback
+        self._shutdown_requested = threading.Event()  # Set by the first signal, later ones are ignored
 
-        # Create a pipe for handling signal wakeup
-        self.read_fd, self.write_fd = os.pipe()
-
-        # Set the write end of the pipe to non-blocking mode
-        flags = fcntl.fcntl(self.write_fd, fcntl.F_GETFL)
-        fcntl.fcntl(self.write_fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
-
-        signal.set_wakeup_fd(self.write_fd)
-
-        # Register the file descriptor with Tkinter to read from it
-        self.application.root.createfilehandler(self.read_fd, tk.READABLE, self._on_signal_received)
+        # Python runs signal handlers only between bytecodes, so the blocked Tkinter loop has to be woken up.
+        # The command processor's pipe is already watched by Tkinter: the signal byte wakes it, the handler
+        # runs and enqueues the shutdown, and the same drain executes it. A full pipe already means a wakeup
+        # is pending, so Python need not warn about the dropped byte.
+        signal.set_wakeup_fd(self.command_processor.wakeup_fd, warn_on_full_buffer=False)
 
     def register_signal_handler(self) -> None:
         """Register signal handler for SIGINT and SIGTERM for graceful shutdown."""
@@ -35,18 +27,16 @@ class SignalHandler:
 
     def _handle_signal(self, signum, frame):
         """Handle the signal and enqueue the shutdown command."""
-        self.logger.info(f"Signal {signum} received. Enqueuing shutdown command.")
+        if self._shutdown_requested.is_set():
+            self.logger.debug("Signal %s received, shutdown already requested.", signum)
+            return
+        self._shutdown_requested.set()
+        self.logger.info("Signal %s received. Enqueuing shutdown command.", signum)
         self.command_processor.enqueue_command(self.application.shutdown_app)
 
-    def _on_signal_received(self, fd, mask):
-        """Callback when data is available on the signal pipe."""
-        os.read(fd, 1)  # Clear the signal byte to prevent buffer overflow
-        self.logger.debug("Signal processed by Tkinter event loop.")
-
     def unregister_signal_handler(self) -> None:
         """Unregister the signal handlers and restore default behavior."""
         signal.signal(signal.SIGINT, signal.SIG_DFL)
         signal.signal(signal.SIGTERM, signal.SIG_DFL)
-        os.close(self.read_fd)
-        os.close(self.write_fd)
+        signal.set_wakeup_fd(-1)
         self.logger.info("Signal handlers unregistered and reset to default.")